@@ -0,0 +1,136 @@
+"""Benchmark: download_data's old chunked pd.concat load vs the Arrow fetch path.
+
+Runs both loaders against an in-memory cursor that serves synthetic FOIS-like
+rows through fetchmany(), so no database is needed. Each run happens in a
+fresh process and reports wall time and peak RSS growth over the generated
+input, so Arrow's own allocations are counted too. The concat loader's time
+per row grows with the table size, extract.fetch_arrow's stays flat.
+
+    python bench_load_data.py --rows 100000 200000 400000 800000
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import oracledb
+import pandas as pd
+
+import extract
+
+CHUNK_SIZE = 10000
+
+# (name, type_code, display_size, internal_size, precision, scale, null_ok)
+DESCRIPTION = [
+    ("YYMM", oracledb.DB_TYPE_VARCHAR, 6, 6, None, None, True),
+    ("ZONE_FRM", oracledb.DB_TYPE_VARCHAR, 4, 4, None, None, True),
+    ("CMDT", oracledb.DB_TYPE_VARCHAR, 10, 10, None, None, True),
+    ("CHBL_WGHT", oracledb.DB_TYPE_NUMBER, 22, 22, 12, 2, True),
+    ("WR", oracledb.DB_TYPE_NUMBER, 22, 22, 14, 2, True),
+    ("TOT_FRT_INCL_GST", oracledb.DB_TYPE_NUMBER, 22, 22, 14, 2, True),
+    ("TOT_GST", oracledb.DB_TYPE_NUMBER, 22, 22, 14, 2, True),
+    ("RAKES", oracledb.DB_TYPE_NUMBER, 22, 22, 6, 0, True),
+]
+
+ZONES = ["WR", "CR", "NR", "SR", "ER", "NWR", "SECR", "WCR"]
+COMMODITIES = ["COAL", "CEMENT", "FERT", "POL", "IRON ORE", "FOODGRAIN", "CONT", "OTHER"]
+
+
+def synthetic_rows(n, seed=0):
+    """n row tuples shaped like a carr_apmt_excl_adv table."""
+    rng = np.random.default_rng(seed)
+    months = [f"2024{m:02d}" for m in range(4, 13)] + [f"2025{m:02d}" for m in range(1, 4)]
+    return list(zip(
+        rng.choice(months, n).tolist(),
+        rng.choice(ZONES, n).tolist(),
+        rng.choice(COMMODITIES, n).tolist(),
+        rng.uniform(0, 4000, n).round(2).tolist(),
+        rng.uniform(0, 5e6, n).round(2).tolist(),
+        rng.uniform(0, 6e6, n).round(2).tolist(),
+        rng.uniform(0, 3e5, n).round(2).tolist(),
+        rng.integers(0, 50, n).tolist(),
+    ))
+
+
+class FakeCursor:
+    """Just enough of an oracledb cursor for both loaders."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._pos = 0
+        self.description = DESCRIPTION
+        self.arraysize = 100
+        self.prefetchrows = 2
+
+    def execute(self, sql, binds=None):
+        self._pos = 0
+
+    def fetchmany(self, size):
+        batch = self._rows[self._pos:self._pos + size]
+        self._pos += len(batch)
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Connection without fetch_df_all, so fetch_arrow takes its fetchmany path."""
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def cursor(self):
+        return FakeCursor(self._rows)
+
+
+def load_concat(connection):
+    """The previous load_data loop: grow a DataFrame with pd.concat per chunk."""
+    cursor = connection.cursor()
+    cursor.execute("SELECT * FROM t")
+    cols = [col[0] for col in cursor.description]
+    df = pd.DataFrame(columns=cols)
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            break
+        df = pd.concat([df, pd.DataFrame(rows, columns=cols)], ignore_index=True)
+    return df
+
+
+def load_arrow(connection):
+    """The current load_data path: one Arrow table, materialised once."""
+    return extract.fetch_arrow(connection, "SELECT * FROM t", arraysize=CHUNK_SIZE).to_pandas()
+
+
+LOADERS = {"concat": load_concat, "arrow": load_arrow}
+
+
+def measure(loader_name, n):
+    """(seconds, peak RSS growth MiB, frame MiB) for one load in this process."""
+    rows = synthetic_rows(n)
+    baseline = extract.peak_rss_mb()
+    start = time.perf_counter()
+    df = LOADERS[loader_name](FakeConnection(rows))
+    seconds = time.perf_counter() - start
+    peak = extract.peak_rss_mb() - baseline
+    return seconds, peak, df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark download_data table loading")
+    parser.add_argument("--rows", nargs="+", type=int, default=[100000, 200000, 400000, 800000])
+    parser.add_argument("--loaders", nargs="+", choices=list(LOADERS), default=list(LOADERS))
+    args = parser.parse_args()
+
+    print(f"{'loader':<8}{'rows':>10}{'seconds':>10}{'us/row':>9}{'peak MiB':>11}{'frame MiB':>11}")
+    for n in args.rows:
+        for name in args.loaders:
+            # One process per run so peak RSS isn't inherited from earlier runs
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                seconds, peak, frame = pool.submit(measure, name, n).result()
+            print(f"{name:<8}{n:>10}{seconds:>10.2f}{seconds / n * 1e6:>9.2f}{peak:>11.1f}{frame:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark: process startup cost of thin vs thick driver mode.
+
+Each mode is timed in a fresh interpreter, the way a script or a Streamlit
+server starts: importing oracledb + db, init_client() (the Instant Client
+load in thick mode) and, with --connect, the first connection and query.
+
+    python bench_startup.py --runs 5 --connect
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import config
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+import db
+t1 = time.perf_counter()
+db.init_client()
+t2 = time.perf_counter()
+result = {"import": t1 - t0, "init": t2 - t1, "mode": db.driver_mode()}
+if CONNECT:
+    conn = db.connect()
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM DUAL")
+        cur.fetchone()
+    conn.close()
+    result["connect"] = time.perf_counter() - t2
+print(json.dumps(result))
+"""
+
+
+def probe(mode, connect):
+    """Timings of one fresh process in the given driver mode."""
+    env = dict(os.environ, ORACLE_DRIVER_MODE=mode)
+    code = f"CONNECT = {connect!r}\n" + PROBE
+    proc = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if "Error" in line]
+        return {"error": errors[-1] if errors else f"exit code {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark thin vs thick driver startup")
+    parser.add_argument("--modes", nargs="+", choices=config.DRIVER_MODES, default=list(config.DRIVER_MODES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--connect", action="store_true", help="Also time the first connection and query")
+    args = parser.parse_args()
+
+    stages = ["import", "init"] + (["connect"] if args.connect else [])
+    print(f"{'mode':<7}" + "".join(f"{stage + ' ms':>13}" for stage in stages) + f"{'total ms':>12}")
+    for mode in args.modes:
+        runs = [probe(mode, args.connect) for _ in range(args.runs)]
+        failed = [r for r in runs if "error" in r]
+        if failed:
+            print(f"{mode:<7}  failed: {failed[0]['error']}")
+            continue
+        medians = [statistics.median(r[stage] for r in runs) * 1000 for stage in stages]
+        print(f"{mode:<7}" + "".join(f"{m:>13.1f}" for m in medians) + f"{sum(medians):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""End-to-end benchmark suite over synthetic FOIS data in DuckDB.
+
+Times the real code paths of each view against a local stand-in built by
+synthetic_fois.py:
+
+    page1_summary     traffic_summary per-year queries, run concurrently, + derive_rows
+    page2_commodity   commodity_revenue per-year queries, run concurrently, + commodity_table
+    load              download_data's fetch (extract.fetch_arrow) + prepare_frame
+    filter            download_data.filter_data over a fixed set of selections
+    export_<format>   export.export of one month x zone selection
+    extract_1_worker  parallel_extract over month shards, one worker (baseline)
+    extract_parallel  parallel_extract over month shards, --workers workers
+
+--rows is the total across the five FY tables. Every run writes a JSON
+report (environment + per-stage timings) to --report-dir; --compare prints
+each stage against an earlier report.
+
+    python benchmarks.py --rows 1000000 10000000 50000000
+    python benchmarks.py --rows 1000000 --compare bench_reports/bench-20260101-120000.json
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+import commodity_revenue
+import data_source
+import db
+import download_data
+import export
+import extract
+import fiscal
+import parallel_extract
+import synthetic_fois
+import traffic_summary
+
+SCHEMA = synthetic_fois.SCHEMA
+YEARS = fiscal.year_codes()[1:6]      # five closed-out years, newest first
+DATA_DIR = os.environ.get("BENCH_DATA_DIR", ".bench_data")
+REPORT_DIR = os.environ.get("BENCH_REPORT_DIR", "bench_reports")
+
+# Selections timed by the filter stage (from, to, zone)
+FILTERS = [
+    ("All", "All", "All"),
+    ("April", "September", "All"),
+    ("February", "May", "WR"),
+    ("November", "February", "CR"),
+    ("All", "All", "NR"),
+]
+# Selection written by the export stages
+EXPORT_FILTER = ("July", "July", "CR")
+PAGE2_MONTH = fiscal.MONTHS["July"]
+
+
+# --- Data ---
+def data_path(rows, seed, zone_skew, cmdt_skew):
+    name = f"fois_{rows}_s{seed}_z{zone_skew}_c{cmdt_skew}.duckdb"
+    return os.path.join(DATA_DIR, name)
+
+
+def ensure_data(rows, seed, zone_skew, cmdt_skew, regenerate=False):
+    """Path of a DuckDB file holding `rows` rows spread over the five years."""
+    path = data_path(rows, seed, zone_skew, cmdt_skew)
+    if regenerate and os.path.exists(path):
+        os.remove(path)
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        synthetic_fois.build("duckdb", tmp, YEARS, rows // len(YEARS), seed,
+                             zone_skew=zone_skew, cmdt_skew=cmdt_skew)
+        os.replace(tmp, path)
+    return path
+
+
+def fetch_rows(conn, sql, binds):
+    cursor = conn.cursor()
+    try:
+        return cursor.execute(data_source.duckdb_sql(sql), binds).fetchall()
+    finally:
+        cursor.close()
+
+
+# --- Stages ---
+def page1_summary(conn):
+    queries = [traffic_summary.year_query(y, SCHEMA) for y in YEARS]
+    results = db.run_concurrent([functools.partial(fetch_rows, conn, sql, binds) for sql, binds in queries])
+    measures = traffic_summary.measures_from_rows([row for rows in results for row in rows], YEARS)
+    return traffic_summary.derive_rows(measures)
+
+
+def page2_commodity(conn):
+    queries = [commodity_revenue.year_query(y, PAGE2_MONTH, SCHEMA) for y in YEARS]
+    results = db.run_concurrent([functools.partial(fetch_rows, conn, sql, binds) for sql, binds in queries])
+    revenue = commodity_revenue.frame_from_rows([row for rows in results for row in rows])
+    return commodity_revenue.commodity_table(revenue, YEARS[::-1], YEARS[0])
+
+
+def load(conn):
+    table = extract.fetch_arrow(conn, f"SELECT * FROM {SCHEMA}.{synthetic_fois.table_name(YEARS[0])}")
+    return download_data.prepare_frame(table.to_pandas())
+
+
+def filter_all(df):
+    return [download_data.filter_data(df, YEARS[0], *selection) for selection in FILTERS]
+
+
+def export_one(df, fmt, directory):
+    path = export.export(download_data.filter_data(df, YEARS[0], *EXPORT_FILTER), fmt, directory=directory)
+    os.remove(path)
+
+
+def extract_table(path, workers, output_dir):
+    shutil.rmtree(output_dir, ignore_errors=True)
+    return parallel_extract.parallel_extract(
+        functools.partial(duckdb.connect, path, read_only=True), SCHEMA,
+        synthetic_fois.table_name(YEARS[0]), output_dir,
+        strategy="month", workers=workers, dialect="duckdb",
+    )
+
+
+def timed(fn, repeat):
+    """(median seconds, last result) over `repeat` calls."""
+    seconds, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds), result
+
+
+def run_size(path, rows, repeat, workers):
+    """Timings of every stage against one data file."""
+    results = []
+    table_rows = rows // len(YEARS)
+
+    def record(stage, seconds, stage_rows):
+        results.append({
+            "rows": rows,
+            "stage": stage,
+            "seconds": round(seconds, 4),
+            "rows_per_sec": round(stage_rows / seconds) if seconds else None,
+            "peak_rss_mb": round(extract.peak_rss_mb(), 1),
+        })
+        print(f"  {stage:<18}{seconds:>10.3f} s")
+
+    conn = duckdb.connect(path, read_only=True)
+    scratch = tempfile.mkdtemp(prefix="fois_bench_")
+    try:
+        record("page1_summary", timed(lambda: page1_summary(conn), repeat)[0], rows)
+        record("page2_commodity", timed(lambda: page2_commodity(conn), repeat)[0], rows)
+        seconds, df = timed(lambda: load(conn), 1)
+        record("load", seconds, table_rows)
+        record("filter", timed(lambda: filter_all(df), repeat)[0], table_rows * len(FILTERS))
+        subset_rows = len(download_data.filter_data(df, YEARS[0], *EXPORT_FILTER))
+        for fmt in export.FORMATS:
+            seconds = timed(lambda: export_one(df, fmt, scratch), 1)[0]
+            record(f"export_{fmt}", seconds, subset_rows)
+        del df
+        conn.close()
+        conn = None
+        record("extract_1_worker",
+               timed(lambda: extract_table(path, 1, os.path.join(scratch, "x1")), 1)[0], table_rows)
+        record("extract_parallel",
+               timed(lambda: extract_table(path, workers, os.path.join(scratch, "xn")), 1)[0], table_rows)
+    finally:
+        if conn is not None:
+            conn.close()
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+# --- Reporting ---
+def environment(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "duckdb": duckdb.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+        "seed": args.seed,
+        "zone_skew": args.zone_skew,
+        "cmdt_skew": args.cmdt_skew,
+        "repeat": args.repeat,
+        "workers": args.workers,
+        "years": YEARS,
+    }
+
+
+def write_report(report, directory=REPORT_DIR):
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(directory, f"bench-{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def print_table(results, baseline=None):
+    """Stage timings; with a baseline report, also its time and the speed-up."""
+    before = {}
+    if baseline:
+        before = {(r["rows"], r["stage"]): r["seconds"] for r in baseline["results"]}
+    header = f"{'rows':>12}  {'stage':<18}{'seconds':>10}{'rows/s':>14}{'peak MiB':>10}"
+    if baseline:
+        header += f"{'baseline':>10}{'speed-up':>10}"
+    print(header)
+    for r in results:
+        line = (f"{r['rows']:>12,}  {r['stage']:<18}{r['seconds']:>10.3f}"
+                f"{(r['rows_per_sec'] or 0):>14,}{r['peak_rss_mb']:>10.1f}")
+        old = before.get((r["rows"], r["stage"]))
+        if baseline:
+            line += f"{old:>10.3f}{old / r['seconds']:>9.2f}x" if old and r["seconds"] else f"{'-':>10}{'-':>10}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboards and exporters on synthetic data")
+    parser.add_argument("--rows", nargs="+", type=int, default=[1_000_000],
+                        help="Total rows across the five FY tables, e.g. 1000000 10000000 50000000")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--zone-skew", type=float, default=1.1)
+    parser.add_argument("--cmdt-skew", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per fast stage (median is reported)")
+    parser.add_argument("--workers", type=int, default=4, help="Connections for extract_parallel")
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild the synthetic data files")
+    parser.add_argument("--report-dir", default=REPORT_DIR)
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        print(f"Preparing {rows:,} rows...")
+        start = time.perf_counter()
+        path = ensure_data(rows, args.seed, args.zone_skew, args.cmdt_skew, args.regenerate)
+        print(f"  data ready in {time.perf_counter() - start:.1f} s: {path}")
+        results.extend(run_size(path, rows, args.repeat, args.workers))
+
+    report = {"environment": environment(args), "results": results}
+    path = write_report(report, args.report_dir)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print()
+    print_table(results, baseline)
+    print(f"\nReport written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Commodity revenue for page2: period and full-year revenue in one pass per year.
+
+For each FY table a single scan returns, per commodity, the revenue from April
+to the selected month (conditional aggregation) and the full-year revenue;
+ROLLUP adds the full-year grand total as an extra row. Fiscal windows are
+YYMM BETWEEN bind ranges (see fiscal.py). page2 runs year_query() for each
+year concurrently on separate pooled sessions (see db.run_concurrent), so
+latency is that of the slowest year, and commodity_table() pivots the
+stacked rows into its commodity table in one step.
+"""
+import numpy as np
+import pandas as pd
+
+import fiscal
+
+TABLE_PREFIX = "carr_apmt_excl_adv_"
+COLUMNS = ["FY", "Commodity", "Period_Revenue", "Full_Year_Revenue", "Is_Total"]
+MONTHLY_COLUMNS = ["FY", "Commodity", "YYMM", "Revenue"]
+CRORE = 1e7
+
+
+def year_query(year, month_num, schema):
+    """Single scan of one FY table: per-commodity period / full-year revenue plus grand total.
+
+    Returns (sql, binds); the SQL text does not depend on the selected month.
+    """
+    fy_pred, fy_binds = fiscal.fy_filter(year)
+    period_pred, period_binds = fiscal.period_filter(year, month_num)
+    sql = f"""
+        SELECT
+            '{year}' AS FY,
+            TRIM(CMDT) AS Commodity,
+            SUM(CASE WHEN {period_pred} THEN WR END) AS Period_Revenue,
+            SUM(WR) AS Full_Year_Revenue,
+            GROUPING(TRIM(CMDT)) AS Is_Total
+        FROM {schema}.{TABLE_PREFIX}{year}
+        WHERE CMDT IS NOT NULL
+            AND {fy_pred}
+        GROUP BY ROLLUP(TRIM(CMDT))"""
+    return sql, {**fy_binds, **period_binds}
+
+
+def monthly_query(year, schema):
+    """Revenue per commodity and YYMM of one FY table, for the projection engine.
+
+    Returns (sql, binds); unlike year_query() it doesn't depend on a selected
+    month, so one cached result serves every cut-off.
+    """
+    fy_pred, fy_binds = fiscal.fy_filter(year)
+    sql = f"""
+        SELECT
+            '{year}' AS FY,
+            TRIM(CMDT) AS Commodity,
+            YYMM,
+            SUM(WR) AS Revenue
+        FROM {schema}.{TABLE_PREFIX}{year}
+        WHERE CMDT IS NOT NULL
+            AND {fy_pred}
+        GROUP BY TRIM(CMDT), YYMM"""
+    return sql, fy_binds
+
+
+def monthly_frame_from_rows(rows):
+    """Long (FY, Commodity, YYMM, Revenue) frame from monthly_query() rows."""
+    return pd.DataFrame(rows, columns=MONTHLY_COLUMNS)
+
+
+def frame_from_rows(rows):
+    """Long frame (FY, Commodity, Period_Revenue, Full_Year_Revenue, Is_Total) from year_query() rows."""
+    frame = pd.DataFrame(rows, columns=COLUMNS)
+    frame["Is_Total"] = frame["Is_Total"].astype(bool)
+    return frame
+
+
+def commodity_table(revenue, years, current_year):
+    """page2's commodity table, pivoted once from the long frame.
+
+    Returns (table, totals). table has one row per commodity and, for each year,
+    Revenue_<year> (crores, 2 dp) and Percentage_<year> (period revenue as % of
+    the commodity's full-year revenue), then Avg % (mean of the yearly
+    percentages) and Growth % (current year's revenue against the year before
+    it; NaN without a previous year or revenue). totals holds the same keys for
+    the Total row, its percentages taken against each year's full-year grand
+    total. Everything stays numeric; formatting is left to the display.
+
+    Commodities with no revenue rows in a year's period count as 0 for that
+    year, as the per-year outer merges did.
+    """
+    details = revenue[~revenue["Is_Total"] & revenue["Period_Revenue"].notna()]
+    wide = details.pivot(index="Commodity", columns="FY", values=["Period_Revenue", "Full_Year_Revenue"])
+    period = wide["Period_Revenue"].reindex(columns=years).astype(float)
+    full_year = wide["Full_Year_Revenue"].reindex(columns=years).astype(float)
+
+    crores = (period / CRORE).round(2).fillna(0)
+    share = (period / full_year * 100).replace([np.inf, -np.inf], np.nan).round(2).fillna(0)
+
+    table = pd.concat(
+        [crores.add_prefix("Revenue_"), share.add_prefix("Percentage_")], axis=1
+    )[[f"{kind}_{y}" for y in years for kind in ("Revenue", "Percentage")]]
+    table["Avg %"] = share.mean(axis=1).round(2)
+    table["Growth %"] = _growth(crores, years, current_year)
+    table = table.rename_axis(columns=None).reset_index()
+
+    grand = revenue[revenue["Is_Total"]].groupby("FY")["Full_Year_Revenue"].sum(min_count=1)
+    grand = grand.reindex(years).astype(float).fillna(0) / CRORE
+    year_revenue = crores.sum()
+    year_share = (year_revenue / grand.where(grand != 0) * 100).round(2).fillna(0)
+    totals = {"Commodity": "Total"}
+    for y in years:
+        totals[f"Revenue_{y}"] = float(year_revenue[y])
+        totals[f"Percentage_{y}"] = float(year_share[y])
+    totals["Avg %"] = float(year_share.mean().round(2))
+    totals["Growth %"] = float(_growth(year_revenue.to_frame().T, years, current_year).iloc[0])
+    return table, totals
+
+
+def _growth(revenue, years, current_year):
+    """% change of the current year's column over the previous year's (NaN if none)."""
+    position = years.index(current_year)
+    if position == 0:
+        return pd.Series(np.nan, index=revenue.index)
+    previous = revenue[years[position - 1]]
+    return ((revenue[current_year] - previous) / previous.where(previous != 0) * 100).round(2)
@@ -0,0 +1,74 @@
+"""Lossless dtype compaction for loaded FY tables.
+
+A frame straight out of the fetch keeps code columns (ZONE_FRM, CMDT, ...)
+as Python strings and every number as int64/float64. compact_frame() turns
+low-cardinality strings into categoricals and downcasts numbers only where
+every value survives the round trip unchanged, which typically shrinks a
+cached FY table several times over.
+"""
+import numpy as np
+import pandas as pd
+
+# A string column becomes categorical when it has at most this share of distinct values
+CATEGORY_RATIO = 0.5
+
+
+def memory_mb(df):
+    """Deep memory footprint of a frame in MiB."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def _is_string(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def compact_series(series, category_ratio=CATEGORY_RATIO):
+    """Smallest lossless representation of one column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if _is_string(series):
+        if len(series) and series.nunique(dropna=True) <= category_ratio * len(series):
+            return series.astype("category")
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy()
+        finite = values[np.isfinite(values)]
+        # Whole numbers without NaN fit an integer type exactly
+        if len(finite) == len(values) and np.array_equal(finite, np.floor(finite)):
+            if not len(values) or np.abs(values).max() < 2 ** 53:
+                return pd.to_numeric(series.astype(np.int64), downcast="integer")
+        as_float32 = values.astype(np.float32)
+        if np.array_equal(as_float32.astype(values.dtype), values, equal_nan=True):
+            return series.astype(np.float32)
+    return series
+
+
+def compact_frame(df, replacements=None, category_ratio=CATEGORY_RATIO):
+    """Frame with every column compacted; before/after MiB are kept in df.attrs['memory_mb'].
+
+    replacements: columns already converted by the caller (e.g. YYMM as its
+    int32 month key), used as given instead of the original column.
+    """
+    replacements = replacements or {}
+    before = memory_mb(df)
+    compacted = pd.DataFrame(
+        {col: replacements[col] if col in replacements else compact_series(df[col], category_ratio)
+         for col in df.columns},
+        index=df.index,
+    )
+    compacted.attrs["memory_mb"] = (float(before), float(memory_mb(compacted)))
+    return compacted
+
+
+def memory_report(df):
+    """'before -> after MiB' line for a compacted frame, or '' if it wasn't compacted."""
+    sizes = df.attrs.get("memory_mb")
+    if not sizes:
+        return ""
+    before, after = sizes
+    saved = (1 - after / before) * 100 if before else 0.0
+    return f"{before:,.1f} MiB -> {after:,.1f} MiB ({saved:.0f}% smaller)"
@@ -0,0 +1,76 @@
+"""Connection settings from one source: environment variables, then .env.
+
+Every page and script reads the database settings from here instead of
+hard-coding them. Variables already set in the environment win over the
+.env file (the same file server.js reads), so deployments can override
+single values without editing it.
+
+ORACLE_DRIVER_MODE selects python-oracledb's driver: "thin" (default, pure
+Python, no Instant Client needed) or "thick" (loads the Instant Client from
+INSTANT_CLIENT).
+
+DATA_SOURCE selects where the pages read the FY tables from: "oracle"
+(default, the live database) or "duckdb" (an embedded DuckDB engine over the
+local Parquet snapshots written by pull_db.py --format snapshot).
+"""
+import os
+
+ENV_FILE = os.environ.get(
+    "RAIL_ENV_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+)
+
+THIN, THICK = "thin", "thick"
+DRIVER_MODES = (THIN, THICK)
+
+ORACLE, DUCKDB = "oracle", "duckdb"
+DATA_SOURCES = (ORACLE, DUCKDB)
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1].replace("\\\\", "\\")
+    return value
+
+
+def load_env(path=ENV_FILE):
+    """Set KEY=VALUE lines of an env file into os.environ, keeping values already set."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        load_dotenv = None
+    if load_dotenv is not None:
+        load_dotenv(path, override=False)
+        return
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            os.environ.setdefault(key.strip(), _unquote(value))
+
+
+load_env()
+
+# --- Database Connection Parameters ---
+DB_USER = os.environ.get("DB_USER", "")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "")
+DB_HOST = os.environ.get("DB_HOST", "localhost")
+DB_PORT = int(os.environ.get("DB_PORT", "1521"))
+DB_SID = os.environ.get("DB_SID", "")
+TARGET_SCHEMA = os.environ.get("TARGET_SCHEMA", "FOISGOODS")
+
+# --- Driver ---
+DRIVER_MODE = os.environ.get("ORACLE_DRIVER_MODE", THIN).strip().lower()
+if DRIVER_MODE not in DRIVER_MODES:
+    raise ValueError(f"ORACLE_DRIVER_MODE must be one of {DRIVER_MODES}, not {DRIVER_MODE!r}")
+# Instant Client directory, only used in thick mode (None: search the system library path)
+INSTANT_CLIENT = os.environ.get("INSTANT_CLIENT") or None
+
+# --- Data source ---
+DATA_SOURCE = os.environ.get("DATA_SOURCE", ORACLE).strip().lower()
+if DATA_SOURCE not in DATA_SOURCES:
+    raise ValueError(f"DATA_SOURCE must be one of {DATA_SOURCES}, not {DATA_SOURCE!r}")
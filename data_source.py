@@ -0,0 +1,242 @@
+"""Where the pages read the carr_apmt_excl_adv_YY_YY tables from.
+
+Pages and caches run their SQL through get(), not through oracledb directly.
+Two sources share one interface:
+
+    OracleSource   the live database, on db.py's session pool
+    DuckDBSource   an embedded DuckDB engine over the Parquet snapshots
+                   (snapshot_store.py), so heavy reads stay off the OLTP
+                   instance and the pages also work fully offline
+
+config.DATA_SOURCE ("oracle" / "duckdb") picks the source for the process.
+The SQL is the same for both: each snapshot is exposed as a view named like
+the Oracle table (SCHEMA.carr_apmt_excl_adv_YY_YY), and :name binds are
+rewritten to DuckDB's $name parameters. Every statement is recorded by
+query_log.py.
+"""
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import config
+import extract
+import query_log
+import snapshot_store
+
+
+class DataSource:
+    """Interface of a FY-table backend; every method takes Oracle-style SQL and :name binds.
+
+    The public fetch methods record each statement in query_log; backends
+    implement the underscore methods and mark execute / fetch on the record.
+    """
+    name = None
+    Error = Exception       # what the backend raises on connection / query failures
+
+    def init(self):
+        """Prepare the backend once per process (driver load, view registration)."""
+
+    def prepare(self):
+        """Resolve shared resources on the calling thread, before run_concurrent() fans out."""
+
+    def fetch_all(self, sql, binds=None):
+        """(rows, column names) of a query."""
+        with query_log.record(self.name, sql, binds) as rec:
+            rows, columns = self._fetch_all(rec, sql, binds)
+        return rows, columns
+
+    def fetch_one(self, sql, binds=None):
+        """First row of a query."""
+        with query_log.record(self.name, sql, binds) as rec:
+            return self._fetch_one(rec, sql, binds)
+
+    def fetch_arrow(self, sql, binds=None):
+        """Whole query result as an Arrow table."""
+        with query_log.record(self.name, sql, binds) as rec:
+            return self._fetch_arrow(rec, sql, binds)
+
+    def fetch_frame(self, sql, binds=None, prepare=None):
+        """Whole query result as a DataFrame, passed through prepare(df) if given.
+
+        The Arrow-to-pandas conversion and prepare() are timed as the record's convert_s.
+        """
+        with query_log.record(self.name, sql, binds) as rec:
+            df = self._fetch_arrow(rec, sql, binds).to_pandas()
+            if prepare is not None:
+                df = prepare(df)
+            rec.converted()
+        return df
+
+    def _fetch_all(self, rec, sql, binds):
+        raise NotImplementedError
+
+    def _fetch_one(self, rec, sql, binds):
+        raise NotImplementedError
+
+    def _fetch_arrow(self, rec, sql, binds):
+        raise NotImplementedError
+
+
+class OracleSource(DataSource):
+    """The production database through db.py's pooled sessions."""
+    name = config.ORACLE
+
+    def __init__(self):
+        import oracledb
+        self.Error = oracledb.Error
+
+    def init(self):
+        import db
+        db.init_client()
+
+    def prepare(self):
+        import db
+        db.get_pool()
+
+    def _fetch_all(self, rec, sql, binds):
+        import db
+        return db.fetch_all(sql, binds, rec)
+
+    def _fetch_one(self, rec, sql, binds):
+        import db
+        return db.fetch_one(sql, binds, rec)
+
+    def _fetch_arrow(self, rec, sql, binds):
+        import db
+        with db.connection() as conn:
+            # fetch_df_all() executes and fetches in one call, leaving execute_s unset
+            table = extract.fetch_arrow(conn, sql, binds, on_execute=rec.executed)
+        arraysize = extract.ARROW_FETCH_ARRAYSIZE
+        rec.fetched(table.num_rows, table.nbytes, query_log.round_trips(table.num_rows, arraysize, arraysize))
+        return table
+
+
+def duckdb_sql(sql):
+    """Oracle-style :name binds as DuckDB $name parameters (:: casts are left alone)."""
+    return re.sub(r"(?<![:\w]):([A-Za-z_]\w*)", r"$\1", sql)
+
+
+class DuckDBSource(DataSource):
+    """DuckDB in-process, reading the Parquet snapshot store through one view per table.
+
+    The views glob the partition files at query time, so months added by an
+    incremental pull are visible immediately; tables pulled for the first time
+    are picked up on the next query. Each query runs on its own cursor, so
+    concurrent per-year queries are safe.
+    """
+    name = config.DUCKDB
+
+    def __init__(self, root=snapshot_store.SNAPSHOT_ROOT, schema=config.TARGET_SCHEMA, database=":memory:"):
+        import duckdb
+        self.Error = duckdb.Error
+        self.root = root
+        self.schema = schema
+        self.database = database
+        self._conn = None
+        self._tables = None
+        self._lock = threading.Lock()
+
+    def snapshot_tables(self):
+        """Table names with a snapshot under the root."""
+        if not os.path.isdir(self.root):
+            return set()
+        return {
+            entry.name for entry in os.scandir(self.root)
+            if entry.is_dir() and entry.name.startswith(snapshot_store.TABLE_PREFIX)
+            and snapshot_store.snapshot_exists(entry.name, self.root)
+        }
+
+    def _register(self, conn, tables):
+        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.schema}")
+        for table in sorted(tables):
+            files = os.path.join(snapshot_store.table_dir(table, self.root), "**", "*.parquet")
+            # FY / MONTH_KEY only exist for partitioning; ZONE_FRM comes back from the path,
+            # so the columns are listed in source order to match what Oracle returns
+            columns = snapshot_store.source_columns(table, self.root)
+            if columns:
+                projection = ", ".join(f'"{name}"' for name in columns)
+            else:
+                projection = f"* EXCLUDE ({snapshot_store.FY_COLUMN}, {snapshot_store.MONTH_KEY_COLUMN})"
+            conn.execute(f"""
+                CREATE OR REPLACE VIEW {self.schema}.{table} AS
+                SELECT {projection}
+                FROM read_parquet('{files}', hive_partitioning = true,
+                                  hive_types = {{'{snapshot_store.FY_COLUMN}': VARCHAR,
+                                                 '{snapshot_store.MONTH_KEY_COLUMN}': INTEGER,
+                                                 '{snapshot_store.ZONE_COLUMN}': VARCHAR}})
+            """)
+
+    def _connection(self):
+        """The shared DuckDB connection, with a view for every snapshot on disk."""
+        tables = self.snapshot_tables()
+        with self._lock:
+            if self._conn is None:
+                import duckdb
+                self._conn = duckdb.connect(self.database)
+                self._tables = set()
+            if tables != self._tables:
+                self._register(self._conn, tables - self._tables)
+                self._tables = tables
+            return self._conn
+
+    def init(self):
+        self._connection()
+
+    def prepare(self):
+        self._connection()
+
+    @contextmanager
+    def cursor(self):
+        """A cursor of its own (DuckDB cursors are independent, thread-safe connections)."""
+        cursor = self._connection().cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    # In-process engine: no network round trips
+    def _fetch_all(self, rec, sql, binds):
+        with self.cursor() as cur:
+            cur.execute(duckdb_sql(sql), binds or {})
+            rec.executed()
+            rows = cur.fetchall()
+            rec.fetched(len(rows), query_log.row_bytes(rows), 0)
+            return rows, [col[0] for col in cur.description]
+
+    def _fetch_one(self, rec, sql, binds):
+        with self.cursor() as cur:
+            cur.execute(duckdb_sql(sql), binds or {})
+            rec.executed()
+            row = cur.fetchone()
+            rec.fetched(int(row is not None), query_log.row_bytes([row] if row else []), 0)
+            return row
+
+    def _fetch_arrow(self, rec, sql, binds):
+        with self.cursor() as cur:
+            cur.execute(duckdb_sql(sql), binds or {})
+            rec.executed()
+            table = cur.fetch_arrow_table()
+            rec.fetched(table.num_rows, table.nbytes, 0)
+            return table
+
+
+SOURCES = {config.ORACLE: OracleSource, config.DUCKDB: DuckDBSource}
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def get():
+    """The process-wide data source selected by config.DATA_SOURCE."""
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                _source = SOURCES[config.DATA_SOURCE]()
+    return _source
+
+
+def name():
+    """'oracle' or 'duckdb'."""
+    return get().name
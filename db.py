@@ -0,0 +1,205 @@
+"""Shared Oracle connection handling: one session pool per process.
+
+Every page and script acquires sessions from the same pool instead of opening
+its own connection, so a Streamlit rerun reuses an already authenticated
+session rather than paying a TCP + auth handshake.
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import oracledb
+
+import config
+import query_log
+
+try:
+    import streamlit as st
+except ImportError:  # plain scripts don't need Streamlit
+    st = None
+
+# --- Database Connection Parameters (see config.py) ---
+DB_USER = config.DB_USER
+DB_PASSWORD = config.DB_PASSWORD
+DB_HOST = config.DB_HOST
+DB_PORT = config.DB_PORT
+DB_SID = config.DB_SID
+
+TARGET_SCHEMA = config.TARGET_SCHEMA
+DSN = oracledb.makedsn(DB_HOST, DB_PORT, sid=DB_SID)
+
+# --- Pool Settings ---
+POOL_MIN = 1
+POOL_MAX = 8
+POOL_INCREMENT = 1
+STMT_CACHE_SIZE = 50     # statements kept parsed per session
+PING_INTERVAL = 60       # seconds idle before a session is pinged on acquire
+POOL_TIMEOUT = 300       # seconds before idle sessions above POOL_MIN are closed
+WAIT_TIMEOUT = 30000     # ms to wait for a free session when the pool is exhausted
+
+# Per-year queries run side by side, each on its own pooled session (capped at POOL_MAX)
+QUERY_CONCURRENCY = int(os.environ.get("QUERY_CONCURRENCY", "5"))
+
+_client_initialized = False
+init_seconds = 0.0         # time spent in init_client() (Instant Client load in thick mode)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def init_client():
+    """Prepare the driver once per process.
+
+    Thin mode (the default) needs nothing; thick mode loads the Instant Client
+    libraries and is used only when ORACLE_DRIVER_MODE=thick.
+    """
+    global _client_initialized, init_seconds
+    if not _client_initialized:
+        start = time.perf_counter()
+        if config.DRIVER_MODE == config.THICK:
+            oracledb.init_oracle_client(lib_dir=config.INSTANT_CLIENT)
+        init_seconds = time.perf_counter() - start
+        _client_initialized = True
+
+
+def connect():
+    """A standalone (unpooled) connection, for scripts that hold one session."""
+    init_client()
+    return oracledb.connect(user=DB_USER, password=DB_PASSWORD, dsn=DSN)
+
+
+def driver_mode():
+    """'thin' or 'thick', as actually in use by python-oracledb."""
+    return config.THIN if oracledb.is_thin_mode() else config.THICK
+
+
+def create_pool():
+    """Create a session pool with health pings and a statement cache."""
+    init_client()
+    return oracledb.create_pool(
+        user=DB_USER,
+        password=DB_PASSWORD,
+        dsn=DSN,
+        min=POOL_MIN,
+        max=POOL_MAX,
+        increment=POOL_INCREMENT,
+        stmtcachesize=STMT_CACHE_SIZE,
+        ping_interval=PING_INTERVAL,
+        timeout=POOL_TIMEOUT,
+        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+        wait_timeout=WAIT_TIMEOUT,
+    )
+
+
+if st is not None:
+    # Survives reruns and is shared by every session of the Streamlit server
+    _cached_pool = st.cache_resource(show_spinner=False)(create_pool)
+
+
+def _in_streamlit():
+    """True on a Streamlit script thread, where st.cache_resource applies."""
+    if st is None or not st.runtime.exists():
+        return False
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+def get_pool():
+    """The process-wide session pool, created on first use."""
+    global _pool
+    if _in_streamlit():
+        # Remembered so worker threads (which have no script context) reuse it
+        _pool = _cached_pool()
+        return _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_pool()
+    return _pool
+
+
+def acquire():
+    """Take a session from the pool; hand it back with release()."""
+    return get_pool().acquire()
+
+
+def release(conn):
+    """Return a session to the pool."""
+    get_pool().release(conn)
+
+
+@contextmanager
+def connection():
+    """Pooled session for the duration of a with-block."""
+    conn = acquire()
+    try:
+        yield conn
+    finally:
+        release(conn)
+
+
+def ping():
+    """True if a pooled session can reach the database."""
+    try:
+        with connection() as conn:
+            conn.ping()
+        return True
+    except oracledb.Error:
+        return False
+
+
+def fetch_all(sql, binds=None, rec=None):
+    """Run a query on a pooled session and return (rows, column names).
+
+    rec: query_log.Record to mark executed / fetched on (data_source.OracleSource passes one).
+    """
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, binds or {})
+            if rec is not None:
+                rec.executed()
+            rows = cur.fetchall()
+            if rec is not None:
+                rec.fetched(len(rows), query_log.row_bytes(rows),
+                            query_log.round_trips(len(rows), cur.arraysize, cur.prefetchrows))
+            return rows, [col[0] for col in cur.description]
+
+
+def fetch_one(sql, binds=None, rec=None):
+    """First row of a query on a pooled session (rec as in fetch_all)."""
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, binds or {})
+            if rec is not None:
+                rec.executed()
+            row = cur.fetchone()
+            if rec is not None:
+                rec.fetched(int(row is not None), query_log.row_bytes([row] if row else []), 1)
+            return row
+
+
+def run_concurrent(tasks, max_workers=QUERY_CONCURRENCY):
+    """Call no-argument tasks on parallel threads and return their results in task order.
+
+    Each task is expected to open its own session (e.g. from the pool); at most max_workers
+    (and never more than POOL_MAX) run at once. Tasks run in a copy of the caller's
+    context, so per-rerun state such as query_log's records follows them.
+    """
+    tasks = list(tasks)
+    workers = max(1, min(max_workers, POOL_MAX, len(tasks)))
+    if workers == 1:
+        return [task() for task in tasks]
+    contexts = [contextvars.copy_context() for _ in tasks]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-query") as executor:
+        return list(executor.map(lambda ctx, task: ctx.run(task), contexts, tasks))
+
+
+def fetch_all_concurrent(queries, max_workers=QUERY_CONCURRENCY):
+    """fetch_all() for several (sql, binds) pairs at once; results in query order."""
+    get_pool()  # resolve the pool on the calling thread
+    return run_concurrent(
+        [lambda sql=sql, binds=binds: fetch_all(sql, binds) for sql, binds in queries],
+        max_workers,
+    )
@@ -1,52 +1,48 @@
-import oracledb
+import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 from datetime import datetime
 import re
-from io import BytesIO
 import plotly.express as px
-
-# --- Oracle Instant Client Configuration ---
-INSTANT_CLIENT_PATH = r"C:\Users\Craig Michael Dsouza\Downloads\instantclient-basic-windows.x64-23.8.0.25.04\instantclient_23_8"
-
-# --- Database Connection Parameters ---
-DB_USER = "intern"
-DB_PASSWORD = "inT##2025"
-DB_HOST = "10.3.9.4"
-DB_PORT = 1523
-DB_SID = "traffic"
+import db
+import data_source
+import fiscal
+import compaction
+import export
+import export_jobs
+import query_cache
+import query_log
+import profiling
+import revenue_cube
+import row_index
 
 # --- Constants ---
-TARGET_SCHEMA = "FOISGOODS"
+TARGET_SCHEMA = db.TARGET_SCHEMA
 DATE_COLUMN = "YYMM"
 ZONE_COLUMN = "ZONE_FRM"
-DSN = f"{DB_HOST}:{DB_PORT}/{DB_SID}"
 
 # Financial year months (April to March)
-FINANCIAL_MONTHS = [
-    "April", "May", "June", "July", "August", "September",
-    "October", "November", "December", "January", "February", "March"
-]
+FINANCIAL_MONTHS = fiscal.MONTH_NAMES
 
 # Map financial years to table suffixes (e.g., 2024-2025 -> 24_25)
-FINANCIAL_YEARS = {
-    "2024-2025": "24_25",
-    "2023-2024": "23_24",
-    "2022-2023": "22_23",
-    "2021-2022": "21_22",
-    "2020-2021": "20_21",
-    "2019-2020": "19_20",
-    "2018-2019": "18_19",
-    "2017-2018": "17_18"
+FINANCIAL_YEARS = {fiscal.fy_label(y, long=True): y for y in fiscal.year_codes("24_25")}
+
+# Export format choices shown in the sidebar
+EXPORT_FORMATS = {
+    "Excel (.xlsx)": "xlsx",
+    "CSV (.csv.gz)": "csv.gz",
+    "Parquet (.parquet)": "parquet",
 }
 
 @st.cache_resource
-def init_oracle_client():
+def init_data_source():
+    source = data_source.get()
     try:
-        oracledb.init_oracle_client(lib_dir=INSTANT_CLIENT_PATH)
+        source.init()
         return True
-    except oracledb.Error as e:
-        st.error(f"Oracle Client Error: {e}")
+    except source.Error as e:
+        st.error(f"Data source error ({source.name}): {e}")
         return False
 
 def get_table_name(financial_year):
@@ -55,191 +51,393 @@ def get_table_name(financial_year):
         return f"CARR_APMT_EXCL_ADV_{FINANCIAL_YEARS[financial_year]}"
     return None
 
-@st.cache_data(ttl=3600, show_spinner="Loading table data...")
-def load_data(table_name):
-    """Optimized data loading that fetches all rows while being memory efficient."""
+@st.cache_data(show_spinner="Loading table data...", max_entries=4)
+def load_data(table_name, fingerprint):
+    """Table data from the disk result cache; re-fetched only when the table's fingerprint changes.
+
+    `fingerprint` is part of the in-process cache key, so a changed table
+    misses here too instead of waiting for a TTL; the disk cache is therefore
+    read without stale_ok, so the old table never lands under the new key.
+    """
     try:
-        with oracledb.connect(user=DB_USER, password=DB_PASSWORD, dsn=DSN) as conn:
-            # First get column names
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM {TARGET_SCHEMA}.{table_name} WHERE ROWNUM = 0")
-            cols = [col[0] for col in cursor.description]
-            
-            # Use cursor to fetch data in batches
-            cursor.execute(f"SELECT * FROM {TARGET_SCHEMA}.{table_name}")
-            
-            # Initialize empty DataFrame with correct columns
-            df = pd.DataFrame(columns=cols)
-            
-            # Fetch data in chunks to be memory efficient
-            chunk_size = 10000
-            while True:
-                rows = cursor.fetchmany(chunk_size)
-                if not rows:
-                    break
-                temp_df = pd.DataFrame(rows, columns=cols)
-                df = pd.concat([df, temp_df], ignore_index=True)
-            
-            # Convert date column if present
-            if DATE_COLUMN in df.columns:
-                df['temp_date'] = pd.to_datetime(
-                    df[DATE_COLUMN].astype(str), 
-                    format='%Y%m', 
-                    errors='coerce'
-                )
-                df = df.dropna(subset=['temp_date'])
-                # Add financial year column (April-March)
-                df['financial_year'] = df['temp_date'].apply(
-                    lambda x: f"{x.year}-{x.year+1}" if x.month >=4 else f"{x.year-1}-{x.year}"
-                )
-                # Add financial month name
-                df['financial_month'] = df['temp_date'].dt.month.apply(
-                    lambda x: FINANCIAL_MONTHS[x-4] if x >=4 else FINANCIAL_MONTHS[x+8]
-                )
-            
-            return df
+        return query_cache.cached(
+            ("load_data", table_name), [table_name], lambda: fetch_table(table_name), stale_ok=False
+        )
     except Exception as e:
         st.error(f"Data load failed: {e}")
         return pd.DataFrame()
 
-def filter_data(df, start_month=None, end_month=None, zone=None):
-    """Filter data by month range (April-March cycle) and zone."""
+@st.cache_data(show_spinner="Fetching matching rows...", max_entries=16)
+def load_filtered(table_name, fy_code, start_month, end_month, zone, fingerprint):
+    """Only the rows matching the sidebar selections, filtered inside the database (lazy mode)."""
+    try:
+        return fetch_filtered(table_name, fy_code, start_month, end_month, zone)
+    except Exception as e:
+        st.error(f"Data load failed: {e}")
+        return pd.DataFrame()
+
+def fetch_filtered(table_name, fy_code, start_month, end_month, zone):
+    """Matching rows from the disk result cache or the data source (safe to call off the script thread).
+
+    Never stale: load_filtered and the export artifacts are keyed on the table fingerprint.
+    """
+    where, binds = filter_clause(fy_code, start_month, end_month, zone)
+    df = query_cache.cached(
+        ("load_filtered", table_name, where, tuple(sorted(binds.items()))),
+        [table_name],
+        lambda: fetch_table(table_name, where, binds),
+        stale_ok=False,
+    )
+    return df.drop(['financial_year', 'financial_month'], axis=1, errors='ignore')
+
+@st.cache_data(show_spinner=False)
+def load_zones(table_name, fy_code, fingerprint):
+    """Origin zones of a table, from the revenue cube if built, else a SELECT DISTINCT."""
+    if revenue_cube.available([fy_code]):
+        return sorted(revenue_cube.load_cube([fy_code])[ZONE_COLUMN].dropna().unique())
+    rows = query_cache.fetch_all(
+        f"SELECT DISTINCT {ZONE_COLUMN} FROM {TARGET_SCHEMA}.{table_name} WHERE {ZONE_COLUMN} IS NOT NULL",
+        tables=[table_name],
+        stale_ok=False,
+    )
+    return sorted(row[0] for row in rows)
+
+@st.cache_data(show_spinner=False)
+def load_counts(table_name, fingerprint):
+    """Row counts per financial month and per zone, aggregated inside the database."""
+    rows = query_cache.fetch_all(
+        f"SELECT {DATE_COLUMN}, {ZONE_COLUMN}, COUNT(*) FROM {TARGET_SCHEMA}.{table_name} "
+        f"GROUP BY {DATE_COLUMN}, {ZONE_COLUMN}",
+        tables=[table_name],
+        stale_ok=False,
+    )
+    counts = pd.DataFrame(rows, columns=[DATE_COLUMN, ZONE_COLUMN, "ROWS"])
+    counts["financial_month"] = fiscal.calendar(counts[DATE_COLUMN])["financial_month"]
+    # Same rows the eager path keeps: YYMM must parse as a month
+    counts = counts.dropna(subset=["financial_month"])
+    month_count = counts.groupby("financial_month", observed=False)["ROWS"].sum().reindex(FINANCIAL_MONTHS)
+    zone_count = counts.groupby(ZONE_COLUMN)["ROWS"].sum().sort_values(ascending=False)
+    return month_count, zone_count
+
+def month_window(fy_code, start_month=None, end_month=None):
+    """YYMM (first, last) ranges of a From/To selection inside the FY, or None for all months.
+
+    Both load modes filter on it: filter_clause in SQL, filter_data in memory.
+    """
+    if start_month and end_month and start_month != "All" and end_month != "All":
+        return fiscal.month_ranges(fy_code, start_month, end_month)
+    return None
+
+def filter_clause(fy_code, start_month=None, end_month=None, zone=None):
+    """WHERE clause and binds for the sidebar selections (filter_data's rules, run in SQL)."""
+    predicates, binds = [], {}
+    window = month_window(fy_code, start_month, end_month)
+    if window is not None:
+        predicate, month_binds = fiscal.ranges_filter(fy_code, window, DATE_COLUMN)
+        predicates.append(predicate)
+        binds.update(month_binds)
+    if zone and zone != "All":
+        predicates.append(f"{ZONE_COLUMN} = :zone")
+        binds["zone"] = zone
+    if not predicates:
+        return "", binds
+    return " WHERE " + " AND ".join(predicates), binds
+
+def fetch_table(table_name, where="", binds=None):
+    """Rows of a table (optionally restricted by a WHERE clause) as one typed frame."""
+    return data_source.get().fetch_frame(
+        f"SELECT * FROM {TARGET_SCHEMA}.{table_name}{where}", binds, prepare=prepare_frame
+    )
+
+@profiling.profiled("prepare frame")
+def prepare_frame(df):
+    """Fiscal columns, compaction and the month x zone index for a freshly fetched frame."""
+    # Add financial year (April-March) and month name, dropping rows whose YYMM doesn't parse
+    replacements = {}
+    if DATE_COLUMN in df.columns:
+        cal = fiscal.calendar(df[DATE_COLUMN], long_labels=True)
+        df['financial_year'] = cal['financial_year']
+        df['financial_month'] = cal['financial_month']
+        keep = cal['month_key'].notna().to_numpy()
+        df = df[keep]
+        # YYMM kept as its int32 month key (202404) rather than a string
+        replacements[DATE_COLUMN] = cal['month_key'][keep].astype('int32')
+
+    df = compaction.compact_frame(df, replacements)
+    if 'financial_month' in df.columns:
+        # Sorted by fiscal month and zone, with block boundaries for filter_data
+        df = row_index.build(df, 'financial_month', ZONE_COLUMN)
+    return df
+
+@profiling.profiled("filter")
+def filter_data(df, fy_code, start_month=None, end_month=None, zone=None):
+    """Filter data by month range (April-March cycle of fy_code) and zone.
+
+    Frames from fetch_table carry a month x zone block index, so the selection
+    resolves to row slices of the pre-sorted table rather than scans and copies.
+    The slices are then held to month_window(), so rows dated in another FY
+    are dropped exactly as filter_clause drops them in lazy mode.
+    """
     if df.empty:
         return df
 
-    filtered_df = df.copy()
-    
-    if start_month and end_month and start_month != "All" and end_month != "All":
+    months = range(len(FINANCIAL_MONTHS))
+    window = month_window(fy_code, start_month, end_month)
+    if window is not None:
         start_idx = FINANCIAL_MONTHS.index(start_month)
         end_idx = FINANCIAL_MONTHS.index(end_month)
-        
+
         if start_idx <= end_idx:
             # Normal range (e.g., April-September)
-            valid_months = FINANCIAL_MONTHS[start_idx:end_idx+1]
+            months = list(range(start_idx, end_idx + 1))
         else:
-            # Wraparound range (e.g., November-February)
-            valid_months = FINANCIAL_MONTHS[start_idx:] + FINANCIAL_MONTHS[:end_idx+1]
-        
-        filtered_df = filtered_df[filtered_df['financial_month'].isin(valid_months)]
-    
-    if zone and zone != "All" and ZONE_COLUMN in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df[ZONE_COLUMN] == zone]
+            # Wraparound range (e.g., February-May)
+            months = list(range(start_idx, len(FINANCIAL_MONTHS))) + list(range(end_idx + 1))
+
+    if not (zone and zone != "All" and ZONE_COLUMN in df.columns):
+        zone = None
+
+    index = row_index.get(df)
+    if index is not None:
+        filtered_df = row_index.select(df, row_index.positions(index, months, zone))
+    else:
+        # Frames without an index (e.g. cached before it existed) are scanned
+        filtered_df = df
+        if len(months) < len(FINANCIAL_MONTHS):
+            filtered_df = filtered_df[filtered_df['financial_month'].isin([FINANCIAL_MONTHS[m] for m in months])]
+        if zone is not None:
+            filtered_df = filtered_df[filtered_df[ZONE_COLUMN] == zone]
+    if window is not None:
+        # YYMM holds int32 month keys after prepare_frame
+        keys = filtered_df[DATE_COLUMN].astype("int64")
+        in_window = np.zeros(len(filtered_df), dtype=bool)
+        for first, last in window:
+            in_window |= keys.between(int(first), int(last)).to_numpy()
+        if not in_window.all():
+            filtered_df = filtered_df[in_window]
 
-    return filtered_df.drop(['temp_date', 'financial_year', 'financial_month'], axis=1, errors='ignore')
+    filtered_df = filtered_df.drop(['temp_date', 'financial_year', 'financial_month'], axis=1, errors='ignore')
+    filtered_df.attrs = {k: v for k, v in filtered_df.attrs.items() if k != row_index.ATTR}
+    return filtered_df
 
 def main():
     st.set_page_config("Oracle Excel Exporter", layout="wide")
-    st.title("📦 Railway Analytics Data Exporter (Financial Year)")
-
-    # Oracle Init
-    if not init_oracle_client():
-        st.stop()
-
-    # Sidebar - Financial Year Selection
-    with st.sidebar:
-        st.header("1. Select Financial Year")
-        selected_fy = st.selectbox(
-            "Financial Year",
-            options=list(FINANCIAL_YEARS.keys()),
-            index=0
-        )
-        
-        # Automatically determine table name
-        table_name = get_table_name(selected_fy)
-        
-        # Load data with progress indication
-        with st.spinner(f"Loading {table_name} (this may take a while for large tables)..."):
-            df = load_data(table_name)
-            
-        if df.empty:
-            st.error("No data found for selected financial year.")
+    query_log.start_run()
+    with profiling.run("download_data"):
+        st.title("📦 Railway Analytics Data Exporter (Financial Year)")
+
+        # Data source init (Oracle client or the local snapshot engine)
+        if not init_data_source():
             st.stop()
-            
-        st.header("2. Filter Options")
-        
-        # Month range selection
-        st.subheader("Month Range (April-March)")
-        col1, col2 = st.columns(2)
-        with col1:
-            start_month = st.selectbox(
-                "From",
-                options=["All"] + FINANCIAL_MONTHS,
+
+        # Sidebar - Financial Year Selection
+        with st.sidebar:
+            st.header("1. Select Financial Year")
+            selected_fy = st.selectbox(
+                "Financial Year",
+                options=list(FINANCIAL_YEARS.keys()),
                 index=0
             )
-        with col2:
-            end_month = st.selectbox(
-                "To",
-                options=["All"] + FINANCIAL_MONTHS,
-                index=0 if start_month == "All" else FINANCIAL_MONTHS.index(start_month)
+        
+            # Automatically determine table name
+            table_name = get_table_name(selected_fy)
+            fy_code = FINANCIAL_YEARS[selected_fy]
+            source = data_source.get()
+            try:
+                fingerprint = query_cache.table_fingerprint(table_name)
+            except source.Error as e:
+                st.error(f"Data source error ({source.name}): {e}")
+                st.stop()
+
+            # Lazy mode sends the filters to the data source and fetches only matching rows
+            lazy = st.checkbox(
+                "Fetch only matching rows",
+                value=True,
+                help="Filter inside the database instead of loading the whole table first."
             )
+
+            if not lazy:
+                # Load data with progress indication
+                with st.spinner(f"Loading {table_name} (this may take a while for large tables)..."):
+                    df = load_data(table_name, fingerprint)
+
+                if df.empty:
+                    st.error("No data found for selected financial year.")
+                    st.stop()
+
+                report = compaction.memory_report(df)
+                if report:
+                    st.caption(f"{table_name} in memory: {report}")
+            
+            st.header("2. Filter Options")
         
-        # Zone selection
-        zone_options = ["All"]
-        if ZONE_COLUMN in df.columns:
-            zone_options.extend(sorted(df[ZONE_COLUMN].dropna().unique()))
+            # Month range selection
+            st.subheader("Month Range (April-March)")
+            col1, col2 = st.columns(2)
+            with col1:
+                start_month = st.selectbox(
+                    "From",
+                    options=["All"] + FINANCIAL_MONTHS,
+                    index=0
+                )
+            with col2:
+                end_month = st.selectbox(
+                    "To",
+                    options=["All"] + FINANCIAL_MONTHS,
+                    index=0 if start_month == "All" else FINANCIAL_MONTHS.index(start_month)
+                )
         
-        selected_zone = st.selectbox("Zone", zone_options)
+            # Zone selection
+            zone_options = ["All"]
+            if lazy:
+                zone_options.extend(load_zones(table_name, fy_code, fingerprint))
+            elif ZONE_COLUMN in df.columns:
+                zone_options.extend(sorted(df[ZONE_COLUMN].dropna().unique()))
         
-        st.markdown("### Actions")
-        preview = st.button("🔍 Preview")
-        download = st.button("📥 Export to Excel")
+            selected_zone = st.selectbox("Zone", zone_options)
+        
+            export_label = st.selectbox("Export format", list(EXPORT_FORMATS))
+            export_format = EXPORT_FORMATS[export_label]
+
+            st.markdown("### Actions")
+            preview = st.button("🔍 Preview")
+            download = st.button("📥 Export")
 
-    # Filter data
-    filtered_df = filter_data(df, start_month, end_month, selected_zone)
+        # Filter data
+        if not lazy:
+            filtered_df = filter_data(df, fy_code, start_month, end_month, selected_zone)
+        elif preview:
+            filtered_df = load_filtered(table_name, fy_code, start_month, end_month, selected_zone, fingerprint)
+        else:
+            filtered_df = pd.DataFrame()
+
+        # Tabs
+        tab1, tab2 = st.tabs(["📊 Data Preview", "📈 Charts"])
+
+        with tab1:
+            if preview:
+                st.subheader("Filtered Preview")
+                if filtered_df.empty:
+                    st.warning("No matching records.")
+                else:
+                    st.success(f"{len(filtered_df)} rows found (showing first 1000).")
+                    st.dataframe(filtered_df.head(1000))
 
-    # Tabs
-    tab1, tab2 = st.tabs(["📊 Data Preview", "📈 Charts"])
+        with tab2:
+            if revenue_cube.available([fy_code]):
+                # Counts straight from the precomputed monthly cube
+                cube = revenue_cube.load_cube([fy_code])
+                st.subheader("📅 Monthly Distribution")
+                month_count = revenue_cube.month_counts(cube, fy_code)
+                month_names = fiscal.calendar(month_count.index.to_series())["financial_month"]
+                month_count = month_count.groupby(month_names.to_numpy()).sum().reindex(FINANCIAL_MONTHS)
+                st.bar_chart(month_count)
 
-    with tab1:
-        if preview:
-            st.subheader("Filtered Preview")
-            if filtered_df.empty:
-                st.warning("No matching records.")
+                st.subheader("🗺️ Records by Zone")
+                st.bar_chart(revenue_cube.zone_counts(cube, fy_code))
+            elif lazy:
+                month_count, zone_count = load_counts(table_name, fingerprint)
+                st.subheader("📅 Monthly Distribution")
+                st.bar_chart(month_count)
+
+                st.subheader("🗺️ Records by Zone")
+                st.bar_chart(zone_count)
             else:
-                st.success(f"{len(filtered_df)} rows found (showing first 1000).")
-                st.dataframe(filtered_df.head(1000))
-
-    with tab2:
-        if 'financial_month' in df.columns:
-            st.subheader("📅 Monthly Distribution")
-            month_count = df['financial_month'].value_counts()
-            month_count = month_count.reindex(FINANCIAL_MONTHS)  # Ensure correct order
-            st.bar_chart(month_count)
-
-        if ZONE_COLUMN in df.columns:
-            st.subheader("🗺️ Records by Zone")
-            zone_count = df[ZONE_COLUMN].value_counts()
-            st.bar_chart(zone_count)
-
-    # Excel Export
-    if download:
-        if filtered_df.empty:
-            st.warning("No data to export.")
-        else:
-            output = BytesIO()
-            with st.spinner("Preparing Excel file..."):
-                with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                    filtered_df.to_excel(writer, index=False)
+                if 'financial_month' in df.columns:
+                    st.subheader("📅 Monthly Distribution")
+                    month_count = df['financial_month'].value_counts(sort=False)
+                    month_count = month_count.reindex(FINANCIAL_MONTHS)  # Ensure correct order
+                    st.bar_chart(month_count)
+
+                if ZONE_COLUMN in df.columns:
+                    st.subheader("🗺️ Records by Zone")
+                    zone_count = df[ZONE_COLUMN].value_counts()
+                    st.bar_chart(zone_count)
+
+        # Export runs as a background job; identical requests share one cached file
+        if download:
+            filters = (start_month, end_month, selected_zone)
+            if lazy:
+                load = lambda: fetch_filtered(table_name, fy_code, *filters)
+            else:
+                load = lambda frame=filtered_df: frame
+            # Lazy and eager exports are keyed apart: same rows, but built from different frames
+            job = export_jobs.submit(fingerprint, table_name, (*filters, lazy), export_format, load)
 
             # Create filename
             parts = [table_name]
-            
+
             if start_month != "All" and end_month != "All":
                 month_part = f"{start_month[:3]}-{end_month[:3]}"
                 parts.append(month_part)
-            
+
             if selected_zone != "All":
                 parts.append(selected_zone.replace(" ", "_"))
-            
-            filename = "_".join(parts) + ".xlsx"
 
+            # Everything needed to submit the job again if its file is pruned from the cache
+            st.session_state["export_job"] = {
+                "key": job.key,
+                "filename": export.file_name("_".join(parts), export_format),
+                "label": export_label,
+                "submit": (fingerprint, table_name, fy_code, filters, lazy, export_format),
+            }
+
+        if "export_job" in st.session_state:
+            export_status()
+
+        query_log.diagnostics_expander()
+
+def resubmit_export(request):
+    """Submit a remembered export again (its job is gone or its file was pruned)."""
+    fingerprint, table_name, fy_code, filters, lazy, export_format = request["submit"]
+    if lazy:
+        load = lambda: fetch_filtered(table_name, fy_code, *filters)
+    else:
+        frame = filter_data(load_data(table_name, fingerprint), fy_code, *filters)
+        load = lambda: frame
+    job = export_jobs.submit(fingerprint, table_name, (*filters, lazy), export_format, load)
+    request["key"] = job.key
+    return job
+
+def export_status():
+    """Progress of the latest export job while it runs, then its download button once."""
+    request = st.session_state["export_job"]
+    job = export_jobs.get(request["key"])
+    if job is None or (job.status == export_jobs.DONE and job.path and not os.path.exists(job.path)):
+        job = resubmit_export(request)
+    if not job.finished:
+        export_progress(job.key, request["label"])
+    elif job.status == export_jobs.FAILED:
+        st.error(f"Export failed: {job.error}")
+    elif job.path is None:
+        st.warning("No data to export.")
+    else:
+        try:
+            f = open(job.path, "rb")
+        except FileNotFoundError:
+            # Pruned between the check above and here
+            resubmit_export(request)
+            st.rerun()
+        with f:
             st.download_button(
-                "📥 Download Excel File",
-                data=output.getvalue(),
-                file_name=filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                f"📥 Download {request['label']} File",
+                data=f,
+                file_name=request["filename"],
+                mime=export.mime_type(job.fmt),
+                key=f"download_{job.key}"
             )
-            st.success(f"File ready: {filename}")
+        if job.fmt == "xlsx" and job.total_rows >= export.EXCEL_MAX_ROWS:
+            st.info("More rows than one Excel sheet holds: the data continues on Sheet2, Sheet3, ...")
+        st.success(f"File ready: {request['filename']}")
+
+@st.fragment(run_every=1)
+def export_progress(key, export_label):
+    """Progress bar of a running export (polled every second); reruns the page when it finishes."""
+    job = export_jobs.get(key)
+    if job is None or job.finished:
+        st.rerun()
+    label = "Fetching matching rows..." if job.status == export_jobs.FETCHING else f"Writing {export_label} file..."
+    st.progress(job.fraction, text=label)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
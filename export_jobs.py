@@ -0,0 +1,177 @@
+"""Background export jobs with a content-addressed artifact cache.
+
+An export is identified by a hash of (table fingerprint, filters, format).
+The finished file is stored under that hash, so the same FY / month / zone /
+format request from any session is served straight from disk until the
+table's fingerprint moves on. Exports run in a small worker pool; a request
+for a file that is already being generated attaches to the running job
+instead of starting a second one. Each artifact has a small <key>.rows
+sidecar with its row count, so a job served from disk knows it too.
+"""
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import export
+import profiling
+
+ARTIFACT_DIR = os.environ.get("EXPORT_CACHE_DIR", ".export_cache")
+MAX_ARTIFACT_BYTES = int(os.environ.get("EXPORT_CACHE_MAX_MB", "4096")) * 1024 * 1024
+MAX_WORKERS = int(os.environ.get("EXPORT_WORKERS", "2"))
+ROWS_SUFFIX = ".rows"      # sidecar holding an artifact's row count
+
+QUEUED, FETCHING, WRITING, DONE, FAILED = "queued", "fetching", "writing", "done", "failed"
+
+_jobs = {}                 # artifact key -> Job (running or finished in this process)
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="export")
+
+
+class Job:
+    """State of one export, updated by the worker and read by the UI."""
+
+    def __init__(self, key, fmt):
+        self.key = key
+        self.fmt = fmt
+        self.status = QUEUED
+        self.done_rows = 0
+        self.total_rows = 0
+        self.error = None
+        self.path = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def fraction(self):
+        """Share of rows written so far (0.0 - 1.0)."""
+        if self.status == DONE:
+            return 1.0
+        return self.done_rows / self.total_rows if self.total_rows else 0.0
+
+    def progress(self, done_rows, total_rows):
+        self.done_rows, self.total_rows = done_rows, total_rows
+
+
+def artifact_key(fingerprint, table, filters, fmt):
+    """Hash of everything that determines the exported file's contents."""
+    return hashlib.sha256(repr((fingerprint, table, tuple(filters), fmt)).encode("utf-8")).hexdigest()
+
+
+def artifact_path(key, fmt):
+    return os.path.join(ARTIFACT_DIR, key + export.FORMATS[fmt][0])
+
+
+def rows_path(key):
+    return os.path.join(ARTIFACT_DIR, key + ROWS_SUFFIX)
+
+
+def _read_rows(key):
+    try:
+        with open(rows_path(key), encoding="utf-8") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return 0
+
+
+def _finished_job(key, fmt, path):
+    job = Job(key, fmt)
+    job.status, job.path = DONE, path
+    job.done_rows = job.total_rows = _read_rows(key)
+    return job
+
+
+def _prune(keep):
+    """Delete least recently used artifacts until the cache fits MAX_ARTIFACT_BYTES.
+
+    keep: key of the artifact just written; it is never deleted, so its job
+    does not end up DONE with a missing file.
+    """
+    entries = []
+    for name in os.listdir(ARTIFACT_DIR):
+        path = os.path.join(ARTIFACT_DIR, name)
+        if os.path.isfile(path) and not name.startswith("tmp") and not name.endswith(ROWS_SUFFIX):
+            stat = os.stat(path)
+            entries.append((stat.st_atime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= MAX_ARTIFACT_BYTES:
+            break
+        if name.split(".", 1)[0] == keep:
+            continue
+        for path in (os.path.join(ARTIFACT_DIR, name), rows_path(name.split(".", 1)[0])):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
+
+def _run(job, load):
+    try:
+        job.status = FETCHING
+        df = load()
+        if df.empty:
+            job.status = DONE  # nothing to export; no artifact is kept
+            return
+        job.status = WRITING
+        job.total_rows = len(df)
+        tmp = export.export(df, job.fmt, directory=ARTIFACT_DIR, progress=job.progress)
+        size = os.path.getsize(tmp)
+        if size > MAX_ARTIFACT_BYTES:
+            os.remove(tmp)
+            raise ValueError(
+                f"The export is {size / 2**20:.0f} MB, larger than the whole export cache "
+                f"({MAX_ARTIFACT_BYTES / 2**20:.0f} MB, EXPORT_CACHE_MAX_MB); narrow the filters"
+            )
+        with open(rows_path(job.key), "w", encoding="utf-8") as f:
+            f.write(str(job.total_rows))
+        path = artifact_path(job.key, job.fmt)
+        os.replace(tmp, path)
+        job.path = path
+        job.status = DONE
+        _prune(job.key)
+    except Exception as e:
+        job.error = str(e)
+        job.status = FAILED
+
+
+def submit(fingerprint, table, filters, fmt, load):
+    """Job for an export, started in the background unless it is cached or already running.
+
+    load: no-argument callable returning the frame to export; it runs in a
+    worker thread, so it must not call Streamlit.
+    """
+    key = artifact_key(fingerprint, table, filters, fmt)
+    path = artifact_path(key, fmt)
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and job.status != FAILED and (not job.finished or os.path.exists(path)):
+            return job
+        if os.path.exists(path):
+            os.utime(path)  # keep recently served artifacts out of LRU pruning
+            job = _jobs[key] = _finished_job(key, fmt, path)
+            return job
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        job = _jobs[key] = Job(key, fmt)
+    _executor.submit(profiling.in_session(_run, job, load))
+    return job
+
+
+def get(key):
+    """Job by artifact key, or None."""
+    with _lock:
+        return _jobs.get(key)
+
+
+def wait(job, timeout=None, interval=0.2):
+    """Block until a job has finished (for scripts); returns the job."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not job.finished:
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        time.sleep(interval)
+    return job
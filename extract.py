@@ -0,0 +1,260 @@
+"""Bounded-memory streaming extraction from Oracle to CSV / Parquet / snapshot.
+
+Rows are read with cursor.fetchmany() and written chunk by chunk, so peak
+memory is a few fetch batches no matter how large the table is.
+"""
+import os
+import sys
+import time
+
+import oracledb
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+import snapshot_store
+
+# Same metadata query fetch_db.py prints for a table
+COLUMNS_QUERY = """
+    SELECT COLUMN_NAME, DATA_TYPE, DATA_LENGTH, DATA_PRECISION, DATA_SCALE, NULLABLE
+    FROM ALL_TAB_COLUMNS
+    WHERE OWNER = :schema_name AND TABLE_NAME = :table_name
+    ORDER BY COLUMN_ID
+"""
+
+# Bytes per fetch round trip we aim for when sizing arraysize
+TARGET_FETCH_BYTES = 4 * 1024 * 1024
+MIN_ARRAYSIZE = 500
+MAX_ARRAYSIZE = 50000
+
+# Rows per round trip for whole-result Arrow fetches
+ARROW_FETCH_ARRAYSIZE = 10000
+
+# Rows buffered before a snapshot flush (keeps Parquet files reasonably sized)
+SNAPSHOT_FLUSH_ROWS = 500000
+
+# Approximate wire size of fixed-width Oracle types
+FIXED_TYPE_WIDTHS = {
+    "NUMBER": 22,
+    "FLOAT": 22,
+    "BINARY_FLOAT": 4,
+    "BINARY_DOUBLE": 8,
+    "DATE": 7,
+}
+
+
+def fetch_column_details(cursor, schema, table):
+    """Rows of ALL_TAB_COLUMNS for a table, in column order."""
+    cursor.execute(COLUMNS_QUERY, schema_name=schema.upper(), table_name=table.upper())
+    return cursor.fetchall()
+
+
+def estimate_row_width(column_details):
+    """Approximate bytes per row from ALL_TAB_COLUMNS (name, type, length, ...) rows."""
+    width = 0
+    for col in column_details:
+        data_type, data_length = col[1], col[2]
+        if data_type in FIXED_TYPE_WIDTHS:
+            width += FIXED_TYPE_WIDTHS[data_type]
+        elif data_type.startswith("TIMESTAMP"):
+            width += 11
+        else:
+            width += data_length or 32
+    return max(width, 1)
+
+
+def tune_fetch_sizes(row_width, target_bytes=TARGET_FETCH_BYTES):
+    """Pick (arraysize, prefetchrows) so one round trip carries about target_bytes."""
+    arraysize = int(target_bytes // row_width)
+    arraysize = max(MIN_ARRAYSIZE, min(MAX_ARRAYSIZE, arraysize))
+    # Prefetch the same number of rows so the first fetchmany doesn't need an extra trip
+    return arraysize, arraysize
+
+
+def arrow_type(type_code, precision, scale):
+    """Arrow type for one cursor.description entry."""
+    if type_code in (oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_BINARY_INTEGER):
+        if scale == 0 and precision and precision <= 18:
+            return pa.int64()
+        return pa.float64()
+    if type_code in (oracledb.DB_TYPE_BINARY_FLOAT, oracledb.DB_TYPE_BINARY_DOUBLE):
+        return pa.float64()
+    if type_code in (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def arrow_schema(description):
+    """Fixed Arrow schema from cursor.description so every chunk is written with the same types."""
+    return pa.schema([
+        (col[0], arrow_type(col[1], col[4], col[5])) for col in description
+    ])
+
+
+def cursor_schema(cursor, rows):
+    """Arrow schema for a result: from Oracle type codes, else inferred from a first batch.
+
+    The inferred path covers DB-API cursors of local stand-ins (SQLite, DuckDB).
+    """
+    if isinstance(cursor.description[0][1], oracledb.DbType):
+        return arrow_schema(cursor.description)
+    names = [col[0] for col in cursor.description]
+    columns = list(zip(*rows)) if rows else [[] for _ in names]
+    sample = pa.table({name: pa.array(values) for name, values in zip(names, columns)})
+    return pa.schema([
+        (field.name, pa.string() if pa.types.is_null(field.type) else field.type)
+        for field in sample.schema
+    ])
+
+
+def rows_to_arrow(rows, schema):
+    """Columnar Arrow table from a list of row tuples."""
+    columns = list(zip(*rows))
+    return pa.Table.from_arrays(
+        [pa.array(columns[i], type=field.type) for i, field in enumerate(schema)],
+        schema=schema,
+    )
+
+
+def iter_batches(cursor, schema, arraysize):
+    """Yield one Arrow table per fetchmany() batch."""
+    while True:
+        rows = cursor.fetchmany(arraysize)
+        if not rows:
+            break
+        yield rows_to_arrow(rows, schema)
+
+
+def fetch_arrow(connection, sql, binds=None, arraysize=ARROW_FETCH_ARRAYSIZE, on_execute=None):
+    """Whole query result as one Arrow table, built columnar with no per-chunk copies.
+
+    Uses python-oracledb's DataFrame fetch (Arrow-native, 3.0+) when available,
+    otherwise accumulates fetchmany() batches as Arrow chunks and stitches them
+    together once. on_execute() is called between execute and the first fetch
+    (cursor path only; the DataFrame fetch does both in one call).
+    """
+    if hasattr(connection, "fetch_df_all"):
+        odf = connection.fetch_df_all(statement=sql, parameters=binds, arraysize=arraysize)
+        return pa.table(odf)
+    cursor = connection.cursor()
+    try:
+        if hasattr(cursor, "prefetchrows"):
+            cursor.arraysize = arraysize
+            cursor.prefetchrows = arraysize
+        cursor.execute(sql, binds or {})
+        if on_execute is not None:
+            on_execute()
+        first = cursor.fetchmany(arraysize)
+        schema = cursor_schema(cursor, first)
+        chunks = [rows_to_arrow(first, schema)] if first else []
+        return pa.concat_tables([schema.empty_table(), *chunks, *iter_batches(cursor, schema, arraysize)])
+    finally:
+        cursor.close()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+def stream_table(connection, schema, table, output_format, output_path=None,
+                 snapshot_root=snapshot_store.SNAPSHOT_ROOT, query=None, binds=None,
+                 arraysize=None, prefetchrows=None):
+    """Stream a table (or query) to csv / parquet / snapshot without holding it in memory.
+
+    arraysize / prefetchrows default to values tuned from the table's row width.
+    Returns a dict with rows, seconds, rows_per_sec and peak_rss_mb.
+    """
+    cursor = connection.cursor()
+    try:
+        if arraysize is None or prefetchrows is None:
+            details = fetch_column_details(cursor, schema, table)
+            tuned = tune_fetch_sizes(estimate_row_width(details))
+            arraysize = arraysize or tuned[0]
+            prefetchrows = prefetchrows or tuned[1]
+
+        cursor.arraysize = arraysize
+        cursor.prefetchrows = prefetchrows
+        start = time.perf_counter()
+        cursor.execute(query or f"SELECT * FROM {schema}.{table}", binds or {})
+        schema_ = arrow_schema(cursor.description)
+        batches = iter_batches(cursor, schema_, arraysize)
+
+        if output_format == "csv":
+            rows = write_csv(batches, schema_, output_path)
+        elif output_format == "parquet":
+            rows = write_parquet(batches, schema_, output_path)
+        elif output_format == "snapshot":
+            rows = write_snapshot(batches, table, snapshot_root)
+        else:
+            raise ValueError(f"Unknown output format: {output_format}")
+        seconds = time.perf_counter() - start
+    finally:
+        cursor.close()
+
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "arraysize": arraysize,
+        "prefetchrows": prefetchrows,
+    }
+
+
+def write_csv(batches, schema, path):
+    """Append each batch to one CSV file."""
+    rows = 0
+    with pacsv.CSVWriter(path, schema) as writer:
+        for batch in batches:
+            writer.write_table(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_parquet(batches, schema, path):
+    """Append each batch as a row group of one Parquet file."""
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_table(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_snapshot(batches, table, root):
+    """Flush batches into the partitioned snapshot every SNAPSHOT_FLUSH_ROWS rows."""
+    rows = 0
+    pending, pending_rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= SNAPSHOT_FLUSH_ROWS:
+            rows += snapshot_store.write_snapshot(table, pa.concat_tables(pending), root=root)
+            pending, pending_rows = [], 0
+    if pending:
+        rows += snapshot_store.write_snapshot(table, pa.concat_tables(pending), root=root)
+    return rows
+
+
+def print_report(stats):
+    """Console summary of a streaming run."""
+    print(f"Rows written:   {stats['rows']}")
+    print(f"Elapsed:        {stats['seconds']:.1f} s")
+    print(f"Throughput:     {stats['rows_per_sec']:,.0f} rows/sec")
+    print(f"Peak RSS:       {stats['peak_rss_mb']:,.1f} MiB")
+    print(f"arraysize / prefetchrows: {stats['arraysize']} / {stats['prefetchrows']}")
+
+
+def default_output_path(table, output_format):
+    """File name used when no output path is given."""
+    suffix = "data.csv" if output_format == "csv" else "data.parquet"
+    return os.path.join(".", f"{table}_{suffix}")
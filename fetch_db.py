@@ -1,37 +1,28 @@
 import oracledb
+import config
+import db
 import sys
 
-# --- Oracle Instant Client Configuration ---
-# IMPORTANT: Set this to the EXACT path where you extracted Instant Client.
-# This path must contain the .dll files (e.g., oci.dll).
-INSTANT_CLIENT_PATH = r"C:\Users\Craig Michael Dsouza\Downloads\instantclient-basic-windows.x64-23.8.0.25.04\instantclient_23_8"
-
-# --- Database Connection Parameters ---
-DB_USER = "intern"
-DB_PASSWORD = "inT##2025"
-DB_HOST = "10.3.9.4"
-DB_PORT = 1523
-DB_SID = "traffic"
+# --- Database Connection Parameters (from the environment / .env, see config.py) ---
+DB_USER = db.DB_USER
+DSN = db.DSN
 
 # --- Table Details ---
-TARGET_SCHEMA = "FOISGOODS" # The schema owning the table
+TARGET_SCHEMA = db.TARGET_SCHEMA # The schema owning the table
 TARGET_TABLE = "WR_TRAIN_LIST" # The table name
 
-# Construct the DSN (Data Source Name) string for SID connection
-DSN = f"{DB_HOST}:{DB_PORT}/{DB_SID}"
-
-# --- Initialize Oracle Client for Thick Mode ---
-print("Initializing Oracle Client for Thick Mode...")
+# --- Initialize the Oracle driver (thin unless ORACLE_DRIVER_MODE=thick) ---
+print(f"Initializing Oracle driver ({config.DRIVER_MODE} mode)...")
 try:
-    oracledb.init_oracle_client(lib_dir=INSTANT_CLIENT_PATH)
-    print(f"Oracle Client initialized successfully from: {INSTANT_CLIENT_PATH}")
+    db.init_client()
+    print(f"Oracle driver ready in {db.init_seconds * 1000:.0f} ms")
 except oracledb.Error as e:
     error_obj = e.args[0]
     print(f"\n--- Oracle Client Initialization Error ---")
     print(f"Error Message: {error_obj.message}")
     print(f"Please ensure Instant Client is installed correctly at:")
-    print(f"  {INSTANT_CLIENT_PATH}")
-    print(f"And that the path contains the necessary DLLs (like oci.dll).")
+    print(f"  {config.INSTANT_CLIENT}")
+    print(f"Or leave ORACLE_DRIVER_MODE unset to use thin mode, which needs no Instant Client.")
     sys.exit(1)
 
 print(f"\nAttempting to connect to Oracle Database: {DSN} as user: {DB_USER}")
@@ -43,7 +34,7 @@ cursor = None
 
 try:
     print("Establishing database connection...")
-    connection = oracledb.connect(user=DB_USER, password=DB_PASSWORD, dsn=DSN)
+    connection = db.connect()
     print("Successfully connected to the Oracle Database!")
 
     cursor = connection.cursor()
@@ -0,0 +1,170 @@
+"""Fiscal-year (April-March) calendar and sargable YYMM range predicates.
+
+A fiscal window such as April 2024 - February 2025 is one contiguous YYMM
+range ('202404'..'202502'), so it can be written as a plain
+`YYMM BETWEEN :start AND :end` with bind variables. That keeps YYMM
+index- and partition-prunable (no SUBSTR/TO_NUMBER on the column) and gives
+Oracle the same SQL text for every month/year, so cursors are reused.
+
+calendar() derives FY labels, fiscal month ordinals and month names for a
+whole YYMM column at once: each distinct YYMM is decoded a single time and
+the results are spread back to the rows as categorical codes.
+"""
+import numpy as np
+import pandas as pd
+
+# Calendar month number by name, in fiscal order (April first)
+MONTHS = {
+    "April": 4, "May": 5, "June": 6, "July": 7, "August": 8,
+    "September": 9, "October": 10, "November": 11, "December": 12,
+    "January": 1, "February": 2, "March": 3,
+}
+MONTH_NAMES = list(MONTHS)
+
+# Year codes the FY tables exist for, newest first
+LATEST_YEAR = "25_26"
+EARLIEST_YEAR = "17_18"
+
+
+def year_code(start_year):
+    """FY code of the fiscal year starting in a calendar year: 2024 -> '24_25'."""
+    return f"{start_year % 100:02d}_{(start_year + 1) % 100:02d}"
+
+
+def year_codes(latest=LATEST_YEAR, earliest=EARLIEST_YEAR):
+    """FY codes from latest back to earliest: ['25_26', '24_25', ...]."""
+    return [year_code(y) for y in range(fy_start_year(latest), fy_start_year(earliest) - 1, -1)]
+
+
+def fy_label(year_code, long=False):
+    """Display label of a FY code: '2024-25', or '2024-2025' with long=True."""
+    start = fy_start_year(year_code)
+    return f"{start}-{start + 1}" if long else f"{start}-{(start + 1) % 100:02d}"
+
+
+def fiscal_ordinal(month_num):
+    """Position of a calendar month in the fiscal year: April 1 ... March 12."""
+    return (month_num - 4) % 12 + 1
+
+
+def fy_start_year(year_code):
+    """Calendar year in which a FY code ('24_25') starts: 2024."""
+    return 2000 + int(year_code.split("_")[0])
+
+
+def yymm(year, month):
+    """YYMM string for a calendar year and month."""
+    return f"{year:04d}{month:02d}"
+
+
+def month_yymm(year_code, month_num):
+    """YYMM of a calendar month inside the fiscal year (Jan-Mar fall in the second year)."""
+    start = fy_start_year(year_code)
+    return yymm(start if month_num >= 4 else start + 1, month_num)
+
+
+def fy_bounds(year_code):
+    """(first, last) YYMM of the fiscal year: April to March."""
+    return month_yymm(year_code, 4), month_yymm(year_code, 3)
+
+
+def period_bounds(year_code, month_num):
+    """(first, last) YYMM from April up to and including the selected month."""
+    return month_yymm(year_code, 4), month_yymm(year_code, month_num)
+
+
+def bind_prefix(year_code):
+    """Bind-name prefix that keeps several years' binds apart in one statement."""
+    return f"fy{year_code}"
+
+
+def range_predicate(name, column="YYMM"):
+    """`column BETWEEN :name_start AND :name_end`."""
+    return f"{column} BETWEEN :{name}_start AND :{name}_end"
+
+
+def range_binds(name, bounds):
+    """Bind values for range_predicate(name)."""
+    return {f"{name}_start": bounds[0], f"{name}_end": bounds[1]}
+
+
+def fy_filter(year_code, column="YYMM"):
+    """(predicate, binds) restricting rows to one fiscal year."""
+    name = bind_prefix(year_code)
+    return range_predicate(name, column), range_binds(name, fy_bounds(year_code))
+
+
+def period_filter(year_code, month_num, column="YYMM"):
+    """(predicate, binds) for April up to the selected month of one fiscal year."""
+    name = bind_prefix(year_code) + "_p"
+    return range_predicate(name, column), range_binds(name, period_bounds(year_code, month_num))
+
+
+def month_ranges(year_code, start_month, end_month):
+    """YYMM (first, last) ranges covering start_month..end_month in fiscal order.
+
+    A range that runs past March wraps to April of the same fiscal year
+    (e.g. February-May is Feb-Mar plus Apr-May), giving two ranges.
+    """
+    order = list(MONTHS)
+    start_idx, end_idx = order.index(start_month), order.index(end_month)
+    first, last = MONTHS[order[0]], MONTHS[order[-1]]
+    if start_idx <= end_idx:
+        spans = [(MONTHS[start_month], MONTHS[end_month])]
+    else:
+        spans = [(MONTHS[start_month], last), (first, MONTHS[end_month])]
+    return [(month_yymm(year_code, a), month_yymm(year_code, b)) for a, b in spans]
+
+
+def month_range_filter(year_code, start_month, end_month, column="YYMM"):
+    """(predicate, binds) for a From/To month selection inside one fiscal year."""
+    return ranges_filter(year_code, month_ranges(year_code, start_month, end_month), column)
+
+
+def ranges_filter(year_code, ranges, column="YYMM"):
+    """(predicate, binds) matching any of the YYMM (first, last) ranges of month_ranges()."""
+    prefix = bind_prefix(year_code) + "_m"
+    predicates, binds = [], {}
+    for i, bounds in enumerate(ranges):
+        predicates.append(range_predicate(f"{prefix}{i}", column))
+        binds.update(range_binds(f"{prefix}{i}", bounds))
+    return "(" + " OR ".join(predicates) + ")", binds
+
+
+def calendar(yymm, long_labels=True):
+    """Fiscal calendar columns for a YYMM column, aligned to its index.
+
+    Returns month_key (YYYYMM, Int32), financial_year (FY label, categorical),
+    fiscal_month (April 1 ... March 12, Int8) and financial_month (month name,
+    ordered categorical). Values that don't parse as a YYYYMM month are missing
+    in every column.
+    """
+    yymm = pd.Series(yymm)
+    codes, uniques = pd.factorize(yymm)
+    keys = pd.to_numeric(pd.Series(uniques, dtype=object).astype(str), errors="coerce").to_numpy(float)
+    # Slot len(uniques) stands for unparseable / missing values
+    keys = np.append(keys, np.nan)
+    codes = np.where(codes < 0, len(uniques), codes)
+
+    with np.errstate(invalid="ignore"):
+        month = keys % 100
+        valid = np.isfinite(keys) & (keys == np.floor(keys)) & (keys >= 100) & (month >= 1) & (month <= 12)
+    keys = np.where(valid, keys, 0).astype(np.int64)
+    month = keys % 100
+    start = keys // 100 - (month < 4)
+    ordinal = (month - 4) % 12
+
+    starts = np.unique(start[valid])
+    labels = [fy_label(year_code(int(y)), long=long_labels) for y in starts]
+    fy_codes = np.where(valid, np.searchsorted(starts, start), -1)
+    month_codes = np.where(valid, ordinal, -1)
+
+    row_valid = valid[codes]
+    return pd.DataFrame({
+        "month_key": pd.arrays.IntegerArray(keys[codes].astype(np.int32), ~row_valid),
+        "financial_year": pd.Categorical.from_codes(fy_codes[codes], categories=labels),
+        "fiscal_month": pd.arrays.IntegerArray((ordinal[codes] + 1).astype(np.int8), ~row_valid),
+        "financial_month": pd.Categorical.from_codes(
+            month_codes[codes], categories=MONTH_NAMES, ordered=True
+        ),
+    }, index=yymm.index)
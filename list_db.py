@@ -1,42 +1,41 @@
 import oracledb
+import config
+import db
 import pandas as pd # Import the pandas library
 import sys
 import os
+import argparse
+import extract
 
-# --- Oracle Instant Client Configuration ---
-# IMPORTANT: Set this to the EXACT path where you extracted Instant Client.
-# This path must contain the .dll files (e.g., oci.dll).
-INSTANT_CLIENT_PATH = r"C:\Users\Craig Michael Dsouza\Downloads\instantclient-basic-windows.x64-23.8.0.25.04\instantclient_23_8"
-
-# --- Database Connection Parameters ---
-DB_USER = "intern"
-DB_PASSWORD = "inT##2025"
-DB_HOST = "10.3.9.4"
-DB_PORT = 1523
-DB_SID = "traffic"
+# --- Database Connection Parameters (from the environment / .env, see config.py) ---
+DB_USER = db.DB_USER
+DSN = db.DSN
 
 # --- Table Details ---
-TARGET_SCHEMA = "FOISGOODS"
+TARGET_SCHEMA = db.TARGET_SCHEMA
 TARGET_TABLE = "UPI_29052025"
 
 # --- CSV Output File ---
 OUTPUT_CSV_FILENAME = f"{TARGET_TABLE}_data.csv" # e.g., WR_TRAIN_LIST_data.csv
 
-# Construct the DSN (Data Source Name) string for SID connection
-DSN = f"{DB_HOST}:{DB_PORT}/{DB_SID}"
+parser = argparse.ArgumentParser(description=f"Pull {TARGET_SCHEMA}.{TARGET_TABLE} from Oracle")
+parser.add_argument("--stream", action="store_true",
+                    help="Stream with fetchmany() and write chunk by chunk (flat memory)")
+parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output format in stream mode")
+args = parser.parse_args()
 
-# --- Initialize Oracle Client for Thick Mode ---
-print("Initializing Oracle Client for Thick Mode...")
+# --- Initialize the Oracle driver (thin unless ORACLE_DRIVER_MODE=thick) ---
+print(f"Initializing Oracle driver ({config.DRIVER_MODE} mode)...")
 try:
-    oracledb.init_oracle_client(lib_dir=INSTANT_CLIENT_PATH)
-    print(f"Oracle Client initialized successfully from: {INSTANT_CLIENT_PATH}")
+    db.init_client()
+    print(f"Oracle driver ready in {db.init_seconds * 1000:.0f} ms")
 except oracledb.Error as e:
     error_obj = e.args[0]
     print(f"\n--- Oracle Client Initialization Error ---")
     print(f"Error Message: {error_obj.message}")
     print(f"Please ensure Instant Client is installed correctly at:")
-    print(f"  {INSTANT_CLIENT_PATH}")
-    print(f"And that the path contains the necessary DLLs (like oci.dll).")
+    print(f"  {config.INSTANT_CLIENT}")
+    print(f"Or leave ORACLE_DRIVER_MODE unset to use thin mode, which needs no Instant Client.")
     sys.exit(1)
 
 print(f"\nAttempting to connect to Oracle Database: {DSN} as user: {DB_USER}")
@@ -48,34 +47,42 @@ cursor = None
 
 try:
     print("Establishing database connection...")
-    connection = oracledb.connect(user=DB_USER, password=DB_PASSWORD, dsn=DSN)
+    connection = db.connect()
     print("Successfully connected to the Oracle Database!")
 
-    # Define the SQL query to select all data from your table
-    # Using the full schema.table_name to be explicit
-    query = f"SELECT * FROM {TARGET_SCHEMA}.{TARGET_TABLE}"
+    if args.stream:
+        # Bounded-memory path: fetchmany() batches go straight to the output file
+        output_path = OUTPUT_CSV_FILENAME if args.format == "csv" else extract.default_output_path(TARGET_TABLE, args.format)
+        print(f"\nStreaming {TARGET_SCHEMA}.{TARGET_TABLE} to '{output_path}'...")
+        stats = extract.stream_table(connection, TARGET_SCHEMA, TARGET_TABLE, args.format, output_path=output_path)
+        extract.print_report(stats)
+
+    else:
+        # Define the SQL query to select all data from your table
+        # Using the full schema.table_name to be explicit
+        query = f"SELECT * FROM {TARGET_SCHEMA}.{TARGET_TABLE}"
 
-    print(f"\nExecuting query to fetch data from {TARGET_SCHEMA}.{TARGET_TABLE}...")
-    cursor = connection.cursor()
-    cursor.execute(query)
+        print(f"\nExecuting query to fetch data from {TARGET_SCHEMA}.{TARGET_TABLE}...")
+        cursor = connection.cursor()
+        cursor.execute(query)
 
-    # Fetch all rows
-    rows = cursor.fetchall()
+        # Fetch all rows
+        rows = cursor.fetchall()
 
-    # Get column names from the cursor description
-    column_names = [col[0] for col in cursor.description]
+        # Get column names from the cursor description
+        column_names = [col[0] for col in cursor.description]
 
-    if not rows:
-        print(f"No data found in table {TARGET_SCHEMA}.{TARGET_TABLE}.")
-    else:
-        print(f"Fetched {len(rows)} rows.")
+        if not rows:
+            print(f"No data found in table {TARGET_SCHEMA}.{TARGET_TABLE}.")
+        else:
+            print(f"Fetched {len(rows)} rows.")
 
-        # Create a pandas DataFrame
-        df = pd.DataFrame(rows, columns=column_names)
+            # Create a pandas DataFrame
+            df = pd.DataFrame(rows, columns=column_names)
 
-        # Save DataFrame to CSV
-        df.to_csv(OUTPUT_CSV_FILENAME, index=False, encoding='utf-8')
-        print(f"\nData successfully saved to '{OUTPUT_CSV_FILENAME}'")
+            # Save DataFrame to CSV
+            df.to_csv(OUTPUT_CSV_FILENAME, index=False, encoding='utf-8')
+            print(f"\nData successfully saved to '{OUTPUT_CSV_FILENAME}'")
 
 except oracledb.Error as e:
     error_obj = e.args[0]
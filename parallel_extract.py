@@ -0,0 +1,146 @@
+"""Parallel range-partitioned extraction over several connections.
+
+The table is split into disjoint shards (one per YYMM month, or N hash buckets
+of ROWID) and every shard is fetched on its own connection by a thread or
+process pool and written to its own file. The shard files add up to the full
+table. Connections come from a `connect` callable so the same code runs
+against Oracle or a local SQLite / DuckDB stand-in.
+
+The process pool always uses the "spawn" start method, on Linux too: no
+worker inherits the parent's open sessions, each opens its own through
+`connect`. Spawned workers re-import the calling script, so scripts using
+executor="process" must keep their work behind `if __name__ == "__main__":`
+(as pull_db.py does).
+"""
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import extract
+
+SHARD_STRATEGIES = ("month", "hash")
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")),
+}
+
+# Bucket expression per dialect; each evaluates to 0..n-1 for every row
+HASH_EXPRESSIONS = {
+    "oracle": "ORA_HASH(ROWID, {n_minus_1})",
+    "sqlite": "(rowid % {n})",
+    "duckdb": "(hash(rowid) % {n})",
+}
+
+# Bind placeholder for the shard key per dialect
+PLACEHOLDERS = {"oracle": ":shard", "sqlite": ":shard", "duckdb": "$shard"}
+
+DEFAULT_ARRAYSIZE = 10000
+
+
+def qualified(schema, table):
+    """schema.table, or just table when there is no schema (local stand-ins)."""
+    return f"{schema}.{table}" if schema else table
+
+
+def plan_shards(connection, schema, table, strategy="month", shards=8, dialect="oracle"):
+    """List of {"id", "where", "binds"} describing disjoint shards that cover the table."""
+    if strategy not in SHARD_STRATEGIES:
+        raise ValueError(f"Unknown shard strategy: {strategy}")
+    placeholder = PLACEHOLDERS[dialect]
+
+    if strategy == "month":
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"SELECT DISTINCT YYMM FROM {qualified(schema, table)} ORDER BY YYMM")
+            months = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        plan = [
+            {"id": f"yymm_{str(m).strip()}", "where": f"YYMM = {placeholder}", "binds": {"shard": m}}
+            for m in months if m is not None
+        ]
+        # NULL months would otherwise belong to no shard
+        plan.append({"id": "yymm_null", "where": "YYMM IS NULL", "binds": {}})
+        return plan
+
+    expr = HASH_EXPRESSIONS[dialect].format(n=shards, n_minus_1=shards - 1)
+    return [
+        {"id": f"hash_{i:03d}", "where": f"{expr} = {placeholder}", "binds": {"shard": i}}
+        for i in range(shards)
+    ]
+
+
+def extract_shard(connect, schema, table, shard, output_dir, output_format, arraysize):
+    """Fetch one shard on its own connection and write it to its own file."""
+    start = time.perf_counter()
+    path = os.path.join(output_dir, f"{shard['id']}.{output_format}")
+    connection = connect()
+    try:
+        cursor = connection.cursor()
+        if hasattr(cursor, "prefetchrows"):
+            cursor.arraysize = arraysize
+            cursor.prefetchrows = arraysize
+        cursor.execute(
+            f"SELECT * FROM {qualified(schema, table)} WHERE {shard['where']}", shard["binds"]
+        )
+        first = cursor.fetchmany(arraysize)
+        if not first:
+            return {"id": shard["id"], "path": None, "rows": 0,
+                    "seconds": time.perf_counter() - start}
+        schema_ = extract.cursor_schema(cursor, first)
+
+        def batches():
+            yield extract.rows_to_arrow(first, schema_)
+            yield from extract.iter_batches(cursor, schema_, arraysize)
+
+        writer = extract.write_csv if output_format == "csv" else extract.write_parquet
+        rows = writer(batches(), schema_, path)
+        cursor.close()
+    finally:
+        connection.close()
+    return {"id": shard["id"], "path": path, "rows": rows, "seconds": time.perf_counter() - start}
+
+
+def parallel_extract(connect, schema, table, output_dir, strategy="month", shards=8,
+                     workers=4, executor="thread", output_format="parquet",
+                     dialect="oracle", arraysize=DEFAULT_ARRAYSIZE, progress=None):
+    """Extract the table shard by shard over `workers` concurrent connections.
+
+    connect: zero-argument callable returning a DB-API connection, called once
+    per shard in the worker (must be picklable for executor="process").
+    Returns a dict with per-shard results, total rows, seconds and rows_per_sec.
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+
+    planner = connect()
+    try:
+        plan = plan_shards(planner, schema, table, strategy, shards, dialect)
+    finally:
+        planner.close()
+
+    results = []
+    with EXECUTORS[executor](max_workers=workers) as pool:
+        futures = [
+            pool.submit(extract_shard, connect, schema, table, shard,
+                        output_dir, output_format, arraysize)
+            for shard in plan
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if progress:
+                progress(result, len(results), len(plan))
+
+    results.sort(key=lambda r: r["id"])
+    rows = sum(r["rows"] for r in results)
+    seconds = time.perf_counter() - start
+    return {
+        "shards": results,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+        "peak_rss_mb": extract.peak_rss_mb(),
+    }
@@ -0,0 +1,246 @@
+"""Section-level profiling of Streamlit reruns: wall time and allocations per pipeline stage.
+
+Stages are marked with the section() context manager or the profiled()
+decorator; sections nest, so a rerun is a tree such as page2 > data
+processing > merges. A page calls start_run() at the top and end_run() at
+the bottom; end_run() folds the rerun into its session's totals and writes
+
+    profiles/<session>.folded   collapsed stacks ("page2;totals 1234", self time
+                                in microseconds), the input of flamegraph.pl /
+                                speedscope
+    profiles/<session>.txt      the same tree as an indented table with bars
+
+Everything is a no-op unless PROFILE_SECTIONS=1. Allocations are measured
+with tracemalloc (Python and NumPy memory, not Arrow buffers); it is
+process-wide, so under concurrent sessions the memory columns include other
+sessions' work. PROFILE_MEMORY=0 keeps the timings and skips tracemalloc.
+Totals are kept for the PROFILE_MAX_SESSIONS most recently active sessions;
+older ones are dropped from memory (their files stay on disk).
+"""
+import contextvars
+import functools
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_TRUE = ("1", "true", "yes", "on")
+ENABLED = os.environ.get("PROFILE_SECTIONS", "").strip().lower() in _TRUE
+TRACE_MEMORY = ENABLED and os.environ.get("PROFILE_MEMORY", "1").strip().lower() in _TRUE
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+MAX_SESSIONS = int(os.environ.get("PROFILE_MAX_SESSIONS", "50"))
+BACKGROUND = "background"    # session of sections run outside any page rerun
+BAR_WIDTH = 40
+
+_stack = contextvars.ContextVar("profiling_stack", default=())
+_session = contextvars.ContextVar("profiling_session", default=BACKGROUND)
+_sessions = OrderedDict()    # session -> {path: Stats}, least recently active first
+_lock = threading.Lock()
+
+
+class Stats:
+    """Accumulated totals of one section path."""
+    __slots__ = ("calls", "seconds", "alloc_bytes", "peak_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.alloc_bytes = 0
+        self.peak_bytes = 0
+
+
+class _Frame:
+    __slots__ = ("name", "start", "mem_start", "peak")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.mem_start = 0
+        self.peak = 0
+
+
+def _memory():
+    """(current, peak since the last reset) traced bytes, starting tracemalloc on first use."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return tracemalloc.get_traced_memory()
+
+
+def _enter(name):
+    stack = _stack.get()
+    frame = _Frame(name)
+    if TRACE_MEMORY:
+        current, peak = _memory()
+        if stack:
+            # The parent's peak so far, before the counter is reset for this section
+            stack[-1].peak = max(stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        frame.mem_start = frame.peak = current
+    _stack.set(stack + (frame,))
+    return stack, frame
+
+
+def _exit(stack, frame):
+    seconds = time.perf_counter() - frame.start
+    alloc = peak = 0
+    if TRACE_MEMORY:
+        current, traced_peak = _memory()
+        frame.peak = max(frame.peak, traced_peak)
+        alloc, peak = current - frame.mem_start, frame.peak - frame.mem_start
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, frame.peak)
+    _stack.set(stack)
+    path = tuple(f.name for f in stack) + (frame.name,)
+    with _lock:
+        stats = _session_stats(_session.get()).setdefault(path, Stats())
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.alloc_bytes += alloc
+        stats.peak_bytes = max(stats.peak_bytes, peak)
+
+
+def _session_stats(session):
+    """{path: Stats} of a session, evicting the least recently active ones (call under _lock)."""
+    if session in _sessions:
+        _sessions.move_to_end(session)
+        return _sessions[session]
+    stats = _sessions[session] = {}
+    while len(_sessions) > MAX_SESSIONS:
+        _sessions.popitem(last=False)
+    return stats
+
+
+@contextmanager
+def section(name):
+    """Time (and trace allocations of) the enclosed block as one stage."""
+    if not ENABLED:
+        yield
+        return
+    stack, frame = _enter(name)
+    try:
+        yield
+    finally:
+        _exit(stack, frame)
+
+
+def profiled(name=None):
+    """Decorator form of section(); the stage is named after the function by default."""
+    def decorator(fn):
+        label = name or fn.__name__
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with section(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def in_session(fn, *args):
+    """fn(*args) as a callable for another thread, profiled in the calling session.
+
+    Its sections are recorded as top-level stages of the session rather than
+    under the rerun that started it (which may have finished by then).
+    """
+    ctx = contextvars.copy_context()
+
+    def run():
+        _stack.set(())
+        return fn(*args)
+    return lambda: ctx.run(run)
+
+
+# --- Reruns ---
+def session_id():
+    """Streamlit session of the current script thread, else the process."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx is not None else f"pid{os.getpid()}"
+
+
+def start_run(page):
+    """Open the root section of a rerun (call at the top of a page)."""
+    if not ENABLED:
+        return
+    _session.set(session_id())
+    _stack.set(())
+    _enter(page)
+
+
+def end_run():
+    """Close the rerun's root section and rewrite the session's profile files."""
+    if not ENABLED:
+        return
+    stack = _stack.get()
+    if not stack:
+        return
+    _exit(stack[:-1], stack[-1])
+    _stack.set(())
+    dump(_session.get())
+
+
+@contextmanager
+def run(page):
+    """start_run() / end_run() around a whole page, also when it hits st.stop() or raises."""
+    start_run(page)
+    try:
+        yield
+    finally:
+        end_run()
+
+
+def _self_seconds(stats):
+    """Seconds spent in each path outside its child sections."""
+    result = {path: s.seconds for path, s in stats.items()}
+    for path, s in stats.items():
+        if len(path) > 1 and path[:-1] in result:
+            result[path[:-1]] -= s.seconds
+    return {path: max(0.0, seconds) for path, seconds in result.items()}
+
+
+def folded(session):
+    """Collapsed-stack lines ('a;b;c <self microseconds>') of a session."""
+    with _lock:
+        stats = dict(_sessions.get(session, {}))
+    self_seconds = _self_seconds(stats)
+    return [f"{';'.join(path)} {round(self_seconds[path] * 1e6)}" for path in sorted(stats)]
+
+
+def summary(session):
+    """Indented tree of a session's sections with calls, time, allocations and a time bar."""
+    with _lock:
+        stats = dict(_sessions.get(session, {}))
+    if not stats:
+        return ""
+    self_seconds = _self_seconds(stats)
+    widest = max(s.seconds for s in stats.values()) or 1.0
+    lines = [f"{'section':<44}{'calls':>6}{'total ms':>11}{'self ms':>10}{'alloc MB':>10}{'peak MB':>9}"]
+    for path in sorted(stats):
+        s = stats[path]
+        label = "  " * (len(path) - 1) + path[-1]
+        bar = "█" * max(1, round(BAR_WIDTH * s.seconds / widest))
+        lines.append(
+            f"{label[:44]:<44}{s.calls:>6}{s.seconds * 1000:>11.1f}{self_seconds[path] * 1000:>10.1f}"
+            f"{s.alloc_bytes / 2**20:>10.1f}{s.peak_bytes / 2**20:>9.1f}  {bar}"
+        )
+    return "\n".join(lines)
+
+
+def dump(session, directory=None):
+    """Write the session's .folded and .txt files; returns the .txt path."""
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, re.sub(r"[^\w.-]", "_", session))
+    with open(stem + ".folded", "w", encoding="utf-8") as f:
+        f.write("\n".join(folded(session)) + "\n")
+    with open(stem + ".txt", "w", encoding="utf-8") as f:
+        f.write(summary(session) + "\n")
+    return stem + ".txt"
@@ -0,0 +1,191 @@
+"""Seasonality-aware full-year revenue projections for every cut-off month at once.
+
+Monthly revenue per commodity is laid out as one array R[year, commodity,
+fiscal month] (years oldest first, April = month 0). Its running total C is
+the revenue to date at every cut-off, and each target year is projected from
+the years before it in the window (at most MAX_HISTORY of them). The history
+is a weight matrix W[target, year], so every method is a handful of einsum /
+broadcast operations over the whole (target, commodity, cut-off) cube:
+
+    completion   revenue to date / the commodity's historical cumulative
+                 completion curve at that month (pooled over the history
+                 years; the all-commodity curve where the commodity has none)
+    average      revenue to date + the average remaining revenue
+                 (full year - to date) of the history years
+    trend        revenue to date + the remaining revenue extrapolated by a
+                 least-squares line through the history years
+
+Because every year is projected, the earlier years double as a backtest:
+their projections are compared with their actual full-year revenue, giving an
+error per method and cut-off month. build() runs once per set of years and
+data version; picking a month or a method afterwards is just indexing.
+"""
+import numpy as np
+import pandas as pd
+
+import fiscal
+
+METHODS = {
+    "completion": "Completion ratio",
+    "average": "Average of years",
+    "trend": "Trend",
+}
+MAX_HISTORY = 4          # history years used for each target year
+N_MONTHS = 12
+
+
+def monthly_array(monthly, years):
+    """(commodities, R[year, commodity, month]) from a long (FY, Commodity, YYMM, Revenue) frame.
+
+    Months that don't parse, or fall outside their row's FY, are left out.
+    """
+    cal = fiscal.calendar(monthly["YYMM"], long_labels=True)
+    labels = monthly["FY"].map(lambda y: fiscal.fy_label(y, long=True))
+    keep = (
+        cal["fiscal_month"].notna().to_numpy()
+        & (cal["financial_year"].astype(object) == labels).to_numpy()
+        & monthly["FY"].isin(years).to_numpy()
+        & monthly["Commodity"].notna().to_numpy()
+    )
+    rows = monthly[keep]
+    year_idx = pd.Index(years).get_indexer(rows["FY"])
+    commodity_idx, commodities = pd.factorize(rows["Commodity"], sort=True)
+    month_idx = cal["fiscal_month"][keep].to_numpy(dtype=np.int64) - 1
+
+    revenue = np.zeros((len(years), len(commodities), N_MONTHS))
+    np.add.at(revenue, (year_idx, commodity_idx, month_idx),
+              rows["Revenue"].to_numpy(dtype=float, na_value=0.0))
+    return list(commodities), revenue
+
+
+def history_weights(n_years, max_history=MAX_HISTORY):
+    """W[target, year] = 1 for the (at most max_history) years before each target."""
+    lag = np.arange(n_years)[:, None] - np.arange(n_years)[None, :]
+    return ((lag >= 1) & (lag <= max_history)).astype(float)
+
+
+def _divide(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1.0), np.nan)
+
+
+def project(revenue, max_history=MAX_HISTORY):
+    """Projected full-year revenue {method: P[target, commodity, cut-off]} for all targets.
+
+    Targets without any history year get NaN.
+    """
+    n_years = revenue.shape[0]
+    to_date = revenue.cumsum(axis=2)                       # C[y, c, m]
+    full = to_date[:, :, -1:]                              # F[y, c, 1]
+    remaining = full - to_date                             # F - C
+    weights = history_weights(n_years, max_history)        # W[t, h]
+    n_history = weights.sum(axis=1)[:, None, None]
+    no_history = n_history == 0
+
+    # Completion ratio: pooled historical cumulative share per commodity and month,
+    # with the all-commodity curve where a commodity has no history revenue
+    hist_to_date = np.einsum("th,hcm->tcm", weights, to_date)
+    hist_full = np.einsum("th,hcm->tcm", weights, full)
+    curve = _divide(hist_to_date, hist_full)
+    overall = _divide(hist_to_date.sum(axis=1, keepdims=True), hist_full.sum(axis=1, keepdims=True))
+    curve = np.where(np.isfinite(curve) & (curve > 0), curve, overall)
+    completion = np.where(
+        np.isfinite(curve) & (curve > 0), _divide(to_date, curve), to_date
+    )
+
+    # Average of years: mean remaining revenue of the history years
+    mean_remaining = np.einsum("th,hcm->tcm", weights, remaining) / np.where(no_history, 1, n_history)
+    average = to_date + mean_remaining
+
+    # Trend: weighted least-squares line through the history years' remaining
+    # revenue, evaluated at the target year (flat with a single history year)
+    x = np.arange(n_years, dtype=float)
+    x_mean = (weights @ x)[:, None, None] / np.where(no_history, 1, n_history)
+    dx = x[None, :] - x_mean[:, :, 0]                      # [t, h]
+    sxx = np.einsum("th,th->t", weights, dx ** 2)[:, None, None]
+    # sum of W * dx is zero, so the remaining revenue needs no centring
+    sxy = np.einsum("th,th,hcm->tcm", weights, dx, remaining)
+    slope = np.where(sxx > 0, sxy / np.where(sxx > 0, sxx, 1), 0.0)
+    trend_remaining = mean_remaining + slope * (x[:, None, None] - x_mean)
+    trend = to_date + np.clip(trend_remaining, 0, None)
+
+    return {
+        method: np.where(no_history, np.nan, values)
+        for method, values in (("completion", completion), ("average", average), ("trend", trend))
+    }
+
+
+def backtest(revenue, projections, targets):
+    """Error of each method per cut-off month over the target years (complete years only).
+
+    Returns {method: {"total": [12], "commodity": [12]}}: the mean absolute
+    percentage error of the projected all-commodity total, and the mean
+    weighted absolute percentage error across commodities.
+    """
+    full = revenue.sum(axis=2)                             # F[y, c]
+    actual_total = full[targets].sum(axis=1)[:, None]      # [t, 1]
+    results = {}
+    for method, projected in projections.items():
+        p = projected[targets]                             # [t, c, m]
+        total_error = np.abs(p.sum(axis=1) - actual_total) / actual_total * 100
+        commodity_error = (np.abs(p - full[targets][:, :, None]).sum(axis=1) / actual_total) * 100
+        results[method] = {
+            "total": np.nanmean(total_error, axis=0) if len(targets) else np.full(N_MONTHS, np.nan),
+            "commodity": np.nanmean(commodity_error, axis=0) if len(targets) else np.full(N_MONTHS, np.nan),
+        }
+    return results
+
+
+class Projections:
+    """Projections of every year, commodity, cut-off month and method, plus their backtest."""
+
+    def __init__(self, years, commodities, revenue, max_history=MAX_HISTORY):
+        self.years = list(years)
+        self.commodities = list(commodities)
+        self.revenue = revenue
+        self.to_date = revenue.cumsum(axis=2)
+        self.projected = project(revenue, max_history)
+        # Backtest on the years that have history and a full year of data behind them
+        has_history = history_weights(len(self.years), max_history).sum(axis=1) > 0
+        complete = revenue[:, :, -1].sum(axis=1) > 0
+        self.backtest_years = [y for i, y in enumerate(self.years) if has_history[i] and complete[i]]
+        self.errors = backtest(revenue, self.projected,
+                               [self.years.index(y) for y in self.backtest_years])
+
+    def commodity_frame(self, year, month_num, method):
+        """Commodity, To_Date, Projected_Full_Year and Projected_Remaining at a cut-off."""
+        t, m = self.years.index(year), fiscal.fiscal_ordinal(month_num) - 1
+        to_date = self.to_date[t, :, m]
+        projected = self.projected[method][t, :, m]
+        return pd.DataFrame({
+            "Commodity": self.commodities,
+            "To_Date": to_date,
+            "Projected_Full_Year": projected,
+            "Projected_Remaining": projected - to_date,
+        })
+
+    def error_frame(self, month_num=None):
+        """Backtest errors (%) per method, for one cut-off month or averaged over all."""
+        rows = []
+        for method, label in METHODS.items():
+            errors = self.errors[method]
+            if month_num is None:
+                total, commodity = np.nanmean(errors["total"]), np.nanmean(errors["commodity"])
+            else:
+                m = fiscal.fiscal_ordinal(month_num) - 1
+                total, commodity = errors["total"][m], errors["commodity"][m]
+            rows.append({"Method": label, "Total error %": total, "Commodity error %": commodity})
+        return pd.DataFrame(rows)
+
+    def best_method(self, month_num):
+        """Method with the lowest backtest error on the total at this cut-off."""
+        m = fiscal.fiscal_ordinal(month_num) - 1
+        errors = {method: self.errors[method]["total"][m] for method in METHODS}
+        finite = {k: v for k, v in errors.items() if np.isfinite(v)}
+        return min(finite, key=finite.get) if finite else "completion"
+
+
+def build(monthly, years, max_history=MAX_HISTORY):
+    """Projections from a long (FY, Commodity, YYMM, Revenue) frame; years oldest first."""
+    commodities, revenue = monthly_array(monthly, years)
+    return Projections(years, commodities, revenue, max_history)
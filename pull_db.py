@@ -1,104 +1,184 @@
 import oracledb
+import config
+import db
 import pandas as pd # Import the pandas library
 import sys
 import os
+import argparse
+import snapshot_store
+import extract
+import watermark
+import parallel_extract
 
-# --- Oracle Instant Client Configuration ---
-# IMPORTANT: Set this to the EXACT path where you extracted Instant Client.
-# This path must contain the .dll files (e.g., oci.dll).
-INSTANT_CLIENT_PATH = r"C:\Users\Craig Michael Dsouza\Downloads\instantclient-basic-windows.x64-23.8.0.25.04\instantclient_23_8"
-
-# --- Database Connection Parameters ---
-DB_USER = "intern"
-DB_PASSWORD = "inT##2025"
-DB_HOST = "10.3.9.4"
-DB_PORT = 1523
-DB_SID = "traffic"
+# --- Database Connection Parameters (from the environment / .env, see config.py) ---
+DB_USER = db.DB_USER
+DSN = db.DSN
 
 # --- Table Details ---
-TARGET_SCHEMA = "FOISGOODS"
+TARGET_SCHEMA = db.TARGET_SCHEMA
 TARGET_TABLE = "carr_apmt_excl_adv_24_25"
 
-# --- CSV Output File ---
-OUTPUT_CSV_FILENAME = f"{TARGET_TABLE}_data.csv" # e.g., WR_TRAIN_LIST_data.csv
-
-# Construct the DSN (Data Source Name) string for SID connection
-DSN = f"{DB_HOST}:{DB_PORT}/{DB_SID}"
-
-# --- Initialize Oracle Client for Thick Mode ---
-print("Initializing Oracle Client for Thick Mode...")
-try:
-    oracledb.init_oracle_client(lib_dir=INSTANT_CLIENT_PATH)
-    print(f"Oracle Client initialized successfully from: {INSTANT_CLIENT_PATH}")
-except oracledb.Error as e:
-    error_obj = e.args[0]
-    print(f"\n--- Oracle Client Initialization Error ---")
-    print(f"Error Message: {error_obj.message}")
-    print(f"Please ensure Instant Client is installed correctly at:")
-    print(f"  {INSTANT_CLIENT_PATH}")
-    print(f"And that the path contains the necessary DLLs (like oci.dll).")
-    sys.exit(1)
-
-print(f"\nAttempting to connect to Oracle Database: {DSN} as user: {DB_USER}")
-print("-" * 30)
-
-# --- Connection and Data Pull Logic ---
-connection = None
-cursor = None
-
-try:
-    print("Establishing database connection...")
-    connection = oracledb.connect(user=DB_USER, password=DB_PASSWORD, dsn=DSN)
-    print("Successfully connected to the Oracle Database!")
-
-    # Define the SQL query to select all data from your table
-    # Using the full schema.table_name to be explicit
-    query = f"SELECT * FROM {TARGET_SCHEMA}.{TARGET_TABLE}"
-
-    print(f"\nExecuting query to fetch data from {TARGET_SCHEMA}.{TARGET_TABLE}...")
-    cursor = connection.cursor()
-    cursor.execute(query)
-
-    # Fetch all rows
-    rows = cursor.fetchall()
-
-    # Get column names from the cursor description
-    column_names = [col[0] for col in cursor.description]
-
-    if not rows:
-        print(f"No data found in table {TARGET_SCHEMA}.{TARGET_TABLE}.")
-    else:
-        print(f"Fetched {len(rows)} rows.")
-
-        # Create a pandas DataFrame
-        df = pd.DataFrame(rows, columns=column_names)
-
-        # Save DataFrame to CSV
-        df.to_csv(OUTPUT_CSV_FILENAME, index=False, encoding='utf-8')
-        print(f"\nData successfully saved to '{OUTPUT_CSV_FILENAME}'")
-
-except oracledb.Error as e:
-    error_obj = e.args[0]
-    print(f"\n--- Database Error Occurred ---")
-    print(f"Oracle Error Code: {error_obj.code}")
-    print(f"Error Message: {error_obj.message}")
-    if hasattr(error_obj, 'sqlstate'):
-        print(f"SQLSTATE: {error_obj.sqlstate}")
-    print(f"Please ensure '{TARGET_SCHEMA}.{TARGET_TABLE}' exists and user '{DB_USER}' has SELECT privileges on it.")
-    print("-" * 30)
-
-except Exception as e:
-    print(f"\n--- An unexpected Python error occurred ---")
-    print(f"Error type: {type(e).__name__}")
-    print(f"Error message: {e}")
-    print("Please check your Python code, especially pandas installation.")
+# --- Output ---
+# "csv" writes a single CSV file, "parquet" a single Parquet file (stream mode only)
+# and "snapshot" lands the table in the partitioned Parquet snapshot store (see snapshot_store.py)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pull a FOISGOODS table from Oracle")
+    parser.add_argument("--table", default=TARGET_TABLE, help="Table name inside FOISGOODS")
+    parser.add_argument("--format", choices=["csv", "parquet", "snapshot"], default="csv", help="Output format")
+    parser.add_argument("--snapshot-root", default=snapshot_store.SNAPSHOT_ROOT, help="Snapshot store directory")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream with fetchmany() and write chunk by chunk (flat memory)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-pull months that are new or changed since the last run (snapshot output)")
+    parser.add_argument("--parallel", type=int, metavar="N",
+                        help="Extract with N concurrent connections, one file per shard (csv/parquet)")
+    parser.add_argument("--shard-by", choices=parallel_extract.SHARD_STRATEGIES, default="month",
+                        help="Shard on YYMM months or ORA_HASH(ROWID) buckets (parallel mode)")
+    parser.add_argument("--shards", type=int, default=16, help="Number of hash buckets (parallel mode)")
+    parser.add_argument("--executor", choices=list(parallel_extract.EXECUTORS), default="thread",
+                        help="Thread or process pool (parallel mode)")
+    parser.add_argument("--arraysize", type=int, help="Override the tuned fetch arraysize (stream mode)")
+    parser.add_argument("--prefetchrows", type=int, help="Override the tuned prefetchrows (stream mode)")
+    args = parser.parse_args()
+    if args.parallel and not args.incremental and args.format == "snapshot":
+        # Shards are plain files; the snapshot / watermark layout comes from --stream or --incremental
+        parser.error("--parallel writes csv or parquet shard files; use --stream or --incremental for --format snapshot")
+    return args
+
+
+def main():
+    args = parse_args()
+    target_table = args.table
+
+    # --- CSV Output File ---
+    output_csv_filename = f"{target_table}_data.csv" # e.g., WR_TRAIN_LIST_data.csv
+
+    # --- Initialize the Oracle driver (thin unless ORACLE_DRIVER_MODE=thick) ---
+    print(f"Initializing Oracle driver ({config.DRIVER_MODE} mode)...")
+    try:
+        db.init_client()
+        print(f"Oracle driver ready in {db.init_seconds * 1000:.0f} ms")
+    except oracledb.Error as e:
+        error_obj = e.args[0]
+        print(f"\n--- Oracle Client Initialization Error ---")
+        print(f"Error Message: {error_obj.message}")
+        print(f"Please ensure Instant Client is installed correctly at:")
+        print(f"  {config.INSTANT_CLIENT}")
+        print(f"Or leave ORACLE_DRIVER_MODE unset to use thin mode, which needs no Instant Client.")
+        sys.exit(1)
+
+    print(f"\nAttempting to connect to Oracle Database: {DSN} as user: {DB_USER}")
     print("-" * 30)
 
-finally:
-    print("\n--- Closing connections ---")
-    if cursor:
-        cursor.close()
-        print("Cursor closed.")
-    if connection:
-        connection.close()
-        print("Connection closed.")
\ No newline at end of file
+    # --- Connection and Data Pull Logic ---
+    connection = None
+    cursor = None
+
+    try:
+        print("Establishing database connection...")
+        connection = db.connect()
+        print("Successfully connected to the Oracle Database!")
+
+        if args.incremental:
+            # Delta pull: fingerprint months in Oracle, re-pull only new / changed ones
+            print(f"\nChecking {TARGET_SCHEMA}.{target_table} against its watermark...")
+            result = watermark.incremental_pull(connection, TARGET_SCHEMA, target_table, root=args.snapshot_root)
+            print(f"Months re-pulled: {', '.join(result['changed']) or 'none'}")
+            print(f"Months removed:   {', '.join(result['removed']) or 'none'}")
+            print(f"Months unchanged: {result['unchanged']}")
+            print(f"Rows written:     {result['rows']} in {result['seconds']:.1f} s")
+
+        elif args.parallel:
+            # Disjoint shards fetched concurrently, each on its own connection
+            output_dir = f"{target_table}_shards"
+            print(f"\nExtracting {TARGET_SCHEMA}.{target_table} by {args.shard_by} with {args.parallel} connections...")
+            result = parallel_extract.parallel_extract(
+                db.connect,
+                TARGET_SCHEMA, target_table, output_dir,
+                strategy=args.shard_by, shards=args.shards, workers=args.parallel,
+                executor=args.executor, output_format=args.format,
+                arraysize=args.arraysize or parallel_extract.DEFAULT_ARRAYSIZE,
+                progress=lambda r, done, total: print(f"  [{done}/{total}] {r['id']}: {r['rows']} rows in {r['seconds']:.1f} s"),
+            )
+            print(f"Rows written:   {result['rows']} across {len(result['shards'])} shards in '{output_dir}'")
+            print(f"Elapsed:        {result['seconds']:.1f} s ({result['rows_per_sec']:,.0f} rows/sec)")
+            print(f"Peak RSS:       {result['peak_rss_mb']:,.1f} MiB")
+
+        elif args.stream:
+            # Bounded-memory path: fetchmany() batches go straight to the output file
+            if args.format == "snapshot":
+                snapshot_store.drop_snapshot(target_table, args.snapshot_root)
+            output_path = extract.default_output_path(target_table, args.format)
+            print(f"\nStreaming {TARGET_SCHEMA}.{target_table} to {args.format}...")
+            stats = extract.stream_table(
+                connection, TARGET_SCHEMA, target_table, args.format,
+                output_path=output_path, snapshot_root=args.snapshot_root,
+                arraysize=args.arraysize, prefetchrows=args.prefetchrows,
+            )
+            extract.print_report(stats)
+
+        elif args.format == "parquet":
+            print("Parquet output requires --stream.")
+
+        else:
+            # Define the SQL query to select all data from your table
+            # Using the full schema.table_name to be explicit
+            query = f"SELECT * FROM {TARGET_SCHEMA}.{target_table}"
+
+            print(f"\nExecuting query to fetch data from {TARGET_SCHEMA}.{target_table}...")
+            cursor = connection.cursor()
+            cursor.execute(query)
+
+            # Fetch all rows
+            rows = cursor.fetchall()
+
+            # Get column names from the cursor description
+            column_names = [col[0] for col in cursor.description]
+
+            if not rows:
+                print(f"No data found in table {TARGET_SCHEMA}.{target_table}.")
+            else:
+                print(f"Fetched {len(rows)} rows.")
+
+                # Create a pandas DataFrame
+                df = pd.DataFrame(rows, columns=column_names)
+
+                if args.format == "snapshot":
+                    # Partitioned by FY / month / zone with min-max statistics per file
+                    snapshot_store.drop_snapshot(target_table, args.snapshot_root)
+                    written = snapshot_store.write_snapshot(target_table, df, root=args.snapshot_root)
+                    print(f"\n{written} rows written to snapshot '{snapshot_store.table_dir(target_table, args.snapshot_root)}'")
+                else:
+                    # Save DataFrame to CSV
+                    df.to_csv(output_csv_filename, index=False, encoding='utf-8')
+                    print(f"\nData successfully saved to '{output_csv_filename}'")
+
+    except oracledb.Error as e:
+        error_obj = e.args[0]
+        print(f"\n--- Database Error Occurred ---")
+        print(f"Oracle Error Code: {error_obj.code}")
+        print(f"Error Message: {error_obj.message}")
+        if hasattr(error_obj, 'sqlstate'):
+            print(f"SQLSTATE: {error_obj.sqlstate}")
+        print(f"Please ensure '{TARGET_SCHEMA}.{target_table}' exists and user '{DB_USER}' has SELECT privileges on it.")
+        print("-" * 30)
+
+    except Exception as e:
+        print(f"\n--- An unexpected Python error occurred ---")
+        print(f"Error type: {type(e).__name__}")
+        print(f"Error message: {e}")
+        print("Please check your Python code, especially pandas installation.")
+        print("-" * 30)
+
+    finally:
+        print("\n--- Closing connections ---")
+        if cursor:
+            cursor.close()
+            print("Cursor closed.")
+        if connection:
+            connection.close()
+            print("Connection closed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Disk-backed query-result cache invalidated by table fingerprints, not wall-clock TTLs.
+
+Entries are keyed by (SQL text, binds, tables) and stamped with the
+fingerprint of the tables they read: max(YYMM) plus row count. A hit whose
+fingerprint still matches is served from disk; a hit whose fingerprint has
+moved on is served stale while it is recomputed in the background. Closed
+financial years never change, so their tables are never fingerprinted or
+re-queried. Payloads are zlib-compressed pickles and the cache is capped in
+size with least-recently-used eviction. Queries go to the configured data
+source (data_source.py), whose name is part of every key, so Oracle and
+snapshot results never mix.
+"""
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+
+import data_source
+import db
+import profiling
+
+# --- Settings ---
+CACHE_DIR = os.environ.get("QUERY_CACHE_DIR", ".query_cache")
+MAX_CACHE_BYTES = int(os.environ.get("QUERY_CACHE_MAX_MB", "1024")) * 1024 * 1024
+REVALIDATE_SECONDS = 300   # how long a table fingerprint is trusted before re-checking
+COMPRESSION_LEVEL = 6
+CLOSED = "closed"
+
+_fingerprints = {}         # TABLE (upper case) -> (fingerprint, checked_at)
+_inflight = set()          # background jobs currently running
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="query-cache")
+
+
+# --- Table fingerprints ---
+def current_fy_start(today=None):
+    """Calendar year in which the running financial year started."""
+    today = today or date.today()
+    return today.year if today.month >= 4 else today.year - 1
+
+
+def is_closed_year(table, today=None):
+    """True for FY tables older than the previous financial year (their data is final)."""
+    match = re.search(r"(\d{2})_(\d{2})$", table)
+    if not match:
+        return False
+    fy_start = 2000 + int(match.group(1))
+    return fy_start < current_fy_start(today) - 1
+
+
+def fingerprint_query(table, schema=db.TARGET_SCHEMA):
+    return f"SELECT MAX(YYMM), COUNT(*) FROM {schema}.{table}"
+
+
+def format_fingerprint(max_yymm, rows):
+    """max(YYMM) and row count as one string (also stamped on revenue cube slices)."""
+    return f"{max_yymm}:{rows}"
+
+
+def fetch_fingerprint(table, schema=db.TARGET_SCHEMA):
+    """Fingerprint of a table on the data source."""
+    return format_fingerprint(*data_source.get().fetch_one(fingerprint_query(table, schema)))
+
+
+def normalize_table(table):
+    """Upper-case table name: unquoted Oracle (and DuckDB) identifiers are case-insensitive."""
+    return table.upper()
+
+
+def _refresh_fingerprint(table, schema):
+    fingerprint = fetch_fingerprint(table, schema)
+    with _lock:
+        _fingerprints[table] = (fingerprint, time.time())
+    return fingerprint
+
+
+def table_fingerprint(table, schema=db.TARGET_SCHEMA):
+    """Fingerprint of one table; a known one older than REVALIDATE_SECONDS is refreshed in the background."""
+    table = normalize_table(table)
+    if is_closed_year(table):
+        return CLOSED
+    with _lock:
+        known = _fingerprints.get(table)
+    if known is None:
+        return _refresh_fingerprint(table, schema)
+    fingerprint, checked_at = known
+    if time.time() - checked_at > REVALIDATE_SECONDS:
+        _submit(("fingerprint", table), _refresh_fingerprint, table, schema)
+    return fingerprint
+
+
+def combined_fingerprint(tables, schema=db.TARGET_SCHEMA):
+    """Fingerprint of a set of tables."""
+    tables = sorted({normalize_table(t) for t in tables})
+    return "|".join(f"{t}={table_fingerprint(t, schema)}" for t in tables)
+
+
+# --- Storage ---
+@contextmanager
+def _index():
+    """Connection to the entry index (committed and closed on exit)."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(CACHE_DIR, "index.db"), timeout=30)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, fingerprint TEXT, size INTEGER, last_access REAL
+            )
+        """)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _payload_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.pkl.z")
+
+
+def cache_key(*parts):
+    """Stable hash of the SQL text, binds and tables (or any other picklable parts)."""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+def get(key):
+    """(fingerprint, value) for a cached entry, or None."""
+    with _index() as conn:
+        row = conn.execute("SELECT fingerprint FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(_payload_path(key), "rb") as f:
+                value = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError):
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+    return row[0], value
+
+
+def put(key, fingerprint, value):
+    """Store a value; entries larger than the whole cache are not kept."""
+    payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), COMPRESSION_LEVEL)
+    if len(payload) > MAX_CACHE_BYTES:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = _payload_path(key) + f".{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, _payload_path(key))
+    with _index() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, fingerprint, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, fingerprint, len(payload), time.time()),
+        )
+        _evict(conn)
+
+
+def _evict(conn):
+    """Drop least recently used entries until the cache fits MAX_CACHE_BYTES."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    if total <= MAX_CACHE_BYTES:
+        return
+    for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(_payload_path(key))
+        except OSError:
+            pass
+        total -= size
+        if total <= MAX_CACHE_BYTES:
+            break
+
+
+def clear():
+    """Remove every cached entry."""
+    with _index() as conn:
+        for (key,) in conn.execute("SELECT key FROM entries").fetchall():
+            try:
+                os.remove(_payload_path(key))
+            except OSError:
+                pass
+        conn.execute("DELETE FROM entries")
+
+
+# --- Cached execution ---
+def _submit(job, fn, *args):
+    """Run fn in the background unless the same job is already running.
+
+    It runs in a copy of the caller's context (profiling.in_session), so its
+    statements are logged against the rerun that triggered it.
+    """
+    with _lock:
+        if job in _inflight:
+            return
+        _inflight.add(job)
+
+    def run():
+        try:
+            fn(*args)
+        except Exception:
+            pass  # a failed revalidation keeps serving the stale entry
+        finally:
+            with _lock:
+                _inflight.discard(job)
+
+    _executor.submit(profiling.in_session(run))
+
+
+def _recompute(key, tables, compute, schema):
+    fingerprint = combined_fingerprint(tables, schema)
+    put(key, fingerprint, compute())
+
+
+def cached(key_parts, tables, compute, schema=db.TARGET_SCHEMA, stale_ok=True):
+    """Return compute()'s result, cached on disk until one of `tables` changes.
+
+    key_parts: anything identifying the result (e.g. (sql, binds)).
+    stale_ok: serve an out-of-date entry immediately and refresh it in the background.
+    Callers whose own cache is keyed on the fingerprint (st.cache_data wrappers,
+    export artifacts) must pass False, or they would keep the stale value under
+    the new fingerprint.
+    """
+    tables = tuple(sorted({normalize_table(t) for t in tables}))
+    key = cache_key(data_source.name(), key_parts, tables)
+    fingerprint = combined_fingerprint(tables, schema)
+    entry = get(key)
+    if entry is not None:
+        stored_fingerprint, value = entry
+        if stored_fingerprint == fingerprint:
+            return value
+        if stale_ok:
+            _submit(("entry", key), _recompute, key, tables, compute, schema)
+            return value
+    value = compute()
+    put(key, fingerprint, value)
+    return value
+
+
+def fetch_all(sql, binds=None, tables=(), schema=db.TARGET_SCHEMA, stale_ok=True):
+    """Cached fetch_all() on the data source: rows of the query, keyed by SQL text and binds."""
+    binds = binds or {}
+    return cached(
+        (sql, tuple(sorted(binds.items()))),
+        tables,
+        lambda: data_source.get().fetch_all(sql, binds)[0],
+        schema,
+        stale_ok,
+    )
+
+
+def fetch_all_concurrent(queries, schema=db.TARGET_SCHEMA, max_workers=db.QUERY_CONCURRENCY,
+                         stale_ok=True):
+    """fetch_all() for several (sql, binds, tables) at once, each cached on its own tables.
+
+    Misses run in parallel, each on its own session / cursor; results come back in query order.
+    """
+    data_source.get().prepare()  # resolve the pool / engine on the calling thread
+    return db.run_concurrent(
+        [lambda q=q: fetch_all(q[0], q[1], q[2], schema, stale_ok) for q in queries],
+        max_workers,
+    )
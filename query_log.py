@@ -0,0 +1,199 @@
+"""Per-statement instrumentation of the data-source queries.
+
+Every statement the pages run through data_source.py is recorded with its
+SQL fingerprint, binds, execute and fetch time, row count, approximate bytes
+and round trips (estimated from arraysize / prefetchrows; 0 for the
+in-process DuckDB engine). Records are appended to a JSONL log and also kept
+per Streamlit rerun, so a page can show its slowest statements in a
+diagnostics expander.
+
+    QUERY_LOG_FILE       JSONL log path ("" turns the log off)
+    QUERY_LOG_MAX_MB     size at which the log is rotated to <file>.1
+    QUERY_DIAGNOSTICS=1  show the diagnostics expander on the pages
+"""
+import contextvars
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- Settings ---
+LOG_FILE = os.environ.get("QUERY_LOG_FILE", os.path.join("logs", "queries.jsonl"))
+MAX_LOG_BYTES = int(os.environ.get("QUERY_LOG_MAX_MB", "50")) * 1024 * 1024
+DIAGNOSTICS = os.environ.get("QUERY_DIAGNOSTICS", "").strip().lower() in ("1", "true", "yes", "on")
+BYTES_SAMPLE_ROWS = 1000     # rows sampled when estimating the size of a row result
+
+_write_lock = threading.Lock()
+# Records of the current Streamlit rerun (None outside a run); copied into
+# worker threads by db.run_concurrent
+_run = contextvars.ContextVar("query_log_run", default=None)
+
+
+def fingerprint(sql):
+    """Short hash of the SQL text with whitespace normalised (binds are not part of it)."""
+    return hashlib.sha1(normalize(sql).encode("utf-8")).hexdigest()[:16]
+
+
+def normalize(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def round_trips(rows, arraysize, prefetchrows=0):
+    """Round trips of an execute plus the fetches needed for `rows` rows."""
+    return 1 + math.ceil(max(0, rows - prefetchrows) / max(1, arraysize))
+
+
+def _value_bytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return 8
+
+
+def row_bytes(rows):
+    """Approximate payload bytes of a list of row tuples (from a sample of rows)."""
+    if not rows:
+        return 0
+    sample = rows[:BYTES_SAMPLE_ROWS]
+    sampled = sum(_value_bytes(value) for row in sample for value in row)
+    return int(sampled * len(rows) / len(sample))
+
+
+class Record:
+    """Timings and sizes of one statement, filled in as it runs."""
+
+    def __init__(self, source, sql, binds):
+        self.source = source
+        self.sql = normalize(sql)
+        self.binds = dict(binds or {})
+        self.started = time.perf_counter()
+        self.execute_s = None
+        self.fetch_s = None
+        self.convert_s = None
+        self.rows = None
+        self.bytes = None
+        self.round_trips = None
+        self.error = None
+        self._mark = self.started
+
+    def _lap(self):
+        now = time.perf_counter()
+        seconds, self._mark = now - self._mark, now
+        return seconds
+
+    def executed(self):
+        """Mark the end of the execute call."""
+        self.execute_s = self._lap()
+
+    def fetched(self, rows, nbytes, round_trips):
+        """Mark the end of the fetch, with what it returned."""
+        self.fetch_s = self._lap()
+        self.rows, self.bytes, self.round_trips = rows, nbytes, round_trips
+
+    def converted(self):
+        """Mark the end of the conversion to a DataFrame."""
+        self.convert_s = self._lap()
+
+    def as_dict(self):
+        return {
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "source": self.source,
+            "fingerprint": fingerprint(self.sql),
+            "sql": self.sql,
+            "binds": self.binds,
+            "total_s": round(time.perf_counter() - self.started, 6),
+            "execute_s": _round(self.execute_s),
+            "fetch_s": _round(self.fetch_s),
+            "convert_s": _round(self.convert_s),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "round_trips": self.round_trips,
+            "error": self.error,
+        }
+
+
+def _round(seconds):
+    return None if seconds is None else round(seconds, 6)
+
+
+@contextmanager
+def record(source, sql, binds=None):
+    """Record one statement; the caller marks executed() / fetched() on the yielded Record."""
+    rec = Record(source, sql, binds)
+    try:
+        yield rec
+    except Exception as e:
+        rec.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        emit(rec.as_dict())
+
+
+def emit(entry):
+    """Add a finished record to the current run and the JSONL log."""
+    run = _run.get()
+    if run is not None:
+        with _write_lock:
+            run.append(entry)
+    if LOG_FILE:
+        _append(entry)
+
+
+def _append(entry):
+    line = json.dumps(entry, default=str) + "\n"
+    with _write_lock:
+        try:
+            directory = os.path.dirname(LOG_FILE)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(LOG_FILE) and os.path.getsize(LOG_FILE) > MAX_LOG_BYTES:
+                os.replace(LOG_FILE, LOG_FILE + ".1")
+            with open(LOG_FILE, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass  # instrumentation must never break a page
+
+
+# --- Per-rerun view ---
+def start_run():
+    """Start collecting the statements of this rerun (call at the top of a page)."""
+    _run.set([])
+
+
+def run_records():
+    """Records of the current rerun, in completion order."""
+    return list(_run.get() or [])
+
+
+def slowest(records, top=10):
+    return sorted(records, key=lambda r: r["total_s"], reverse=True)[:top]
+
+
+def diagnostics_expander(top=10, force=False):
+    """Streamlit expander with the slowest statements of this rerun (QUERY_DIAGNOSTICS=1)."""
+    if not (DIAGNOSTICS or force):
+        return
+    import pandas as pd
+    import streamlit as st
+
+    records = run_records()
+    with st.expander(f"Query diagnostics ({len(records)} statements this run)", expanded=False):
+        if not records:
+            st.caption("No statements were executed; everything came from the caches.")
+            return
+        total = sum(r["total_s"] for r in records)
+        st.caption(f"{total:.2f} s in the database across {len(records)} statements "
+                   f"(concurrent statements overlap; background cache refreshes appear only "
+                   f"if they finished before this point). Log: {LOG_FILE or 'off'}")
+        frame = pd.DataFrame(slowest(records, top))[[
+            "total_s", "execute_s", "fetch_s", "convert_s", "rows", "bytes",
+            "round_trips", "source", "fingerprint", "binds", "sql", "error",
+        ]]
+        frame["binds"] = frame["binds"].map(lambda b: json.dumps(b, default=str))
+        st.dataframe(frame, use_container_width=True, hide_index=True)
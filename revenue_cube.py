@@ -0,0 +1,264 @@
+"""Precomputed monthly revenue cube: FY x YYMM x ZONE_FRM x CMDT.
+
+Holds SUM(WR), SUM(CHBL_WGHT), SUM(TOT_FRT_INCL_GST - TOT_GST) and row counts
+at month / origin zone / commodity grain, one Parquet file per financial year.
+It is built once per refresh, either from Oracle (one GROUP BY per table) or
+from the local snapshot store, and every page aggregate (page1's zone sums,
+page2's commodity windows, the exporter's month / zone charts) is answered
+from it with a small in-memory group-by instead of a full-table scan.
+
+Each slice is stamped (in its Parquet metadata) with the fingerprint of the
+table it was built from, in query_cache's max(YYMM):rows form. A slice only
+counts as available while that still matches the table's current
+fingerprint, so open years fall back to the live queries once new rows land
+until the slice is rebuilt; closed years are never re-checked.
+
+    python revenue_cube.py --source oracle --years 25_26 24_25
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+import fiscal
+import query_cache
+import snapshot_store
+
+CUBE_DIR = os.environ.get("CUBE_DIR", "cube")
+TABLE_PREFIX = "carr_apmt_excl_adv_"
+FINGERPRINT_KEY = b"table_fingerprint"   # Parquet metadata key of the source fingerprint
+
+CUBE_SCHEMA = pa.schema([
+    ("FY", pa.string()),
+    ("MONTH_KEY", pa.int32()),
+    ("ZONE_FRM", pa.string()),
+    ("CMDT", pa.string()),
+    ("WR", pa.float64()),
+    ("CHBL_WGHT", pa.float64()),
+    ("ORIG_REV", pa.float64()),
+    ("ROW_COUNT", pa.int64()),
+])
+
+
+def cube_path(year, root=CUBE_DIR):
+    return os.path.join(root, f"FY={year}.parquet")
+
+
+def slice_fingerprint(year, root=CUBE_DIR):
+    """Fingerprint of the table a cube slice was built from, or None (missing / unstamped)."""
+    path = cube_path(year, root)
+    if not os.path.exists(path):
+        return None
+    metadata = pq.read_schema(path).metadata or {}
+    value = metadata.get(FINGERPRINT_KEY)
+    return value.decode("utf-8") if value is not None else None
+
+
+def available(years, root=CUBE_DIR):
+    """True when every year's slice is built and still matches its table's fingerprint."""
+    for year in years:
+        table = f"{TABLE_PREFIX}{year}"
+        if query_cache.is_closed_year(table):
+            if not os.path.exists(cube_path(year, root)):
+                return False
+        elif slice_fingerprint(year, root) != query_cache.table_fingerprint(table):
+            return False
+    return True
+
+
+# --- Building ---
+def cube_query(year, schema):
+    """Oracle aggregate of one FY table at cube grain."""
+    return f"""
+        SELECT YYMM, ZONE_FRM, TRIM(CMDT) AS CMDT,
+               SUM(WR) AS WR,
+               SUM(CHBL_WGHT) AS CHBL_WGHT,
+               SUM(TOT_FRT_INCL_GST - TOT_GST) AS ORIG_REV,
+               COUNT(*) AS ROW_COUNT
+        FROM {schema}.{TABLE_PREFIX}{year}
+        GROUP BY YYMM, ZONE_FRM, TRIM(CMDT)
+    """
+
+
+def _finish(table, year, fingerprint):
+    """Add FY / MONTH_KEY, cast to the cube schema and stamp the source fingerprint.
+
+    Rows whose YYMM doesn't parse keep a null MONTH_KEY: month windows skip
+    them, whole-year totals and counts still include them, as in SQL.
+    """
+    month_key = snapshot_store.parse_month_key(table.column("YYMM"))
+    table = table.drop_columns(["YYMM"]).append_column("MONTH_KEY", month_key)
+    table = table.append_column("FY", pa.array([year] * table.num_rows, pa.string()))
+    table = table.select(CUBE_SCHEMA.names).cast(CUBE_SCHEMA)
+    return table.replace_schema_metadata({FINGERPRINT_KEY: fingerprint.encode("utf-8")})
+
+
+def build_from_oracle(connection, year, schema):
+    """Cube slice of one FY computed inside Oracle."""
+    cursor = connection.cursor()
+    try:
+        # Fingerprint first: rows added during the scan leave the slice looking stale, not fresh
+        cursor.execute(query_cache.fingerprint_query(f"{TABLE_PREFIX}{year}", schema))
+        fingerprint = query_cache.format_fingerprint(*cursor.fetchone())
+        cursor.execute(cube_query(year, schema))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    names = ["YYMM", "ZONE_FRM", "CMDT", "WR", "CHBL_WGHT", "ORIG_REV", "ROW_COUNT"]
+    columns = list(zip(*rows)) if rows else [[] for _ in names]
+    table = pa.table({
+        "YYMM": pa.array([None if v is None else str(v) for v in columns[0]], pa.string()),
+        "ZONE_FRM": pa.array(columns[1], pa.string()),
+        "CMDT": pa.array(columns[2], pa.string()),
+        "WR": pa.array(columns[3], pa.float64()),
+        "CHBL_WGHT": pa.array(columns[4], pa.float64()),
+        "ORIG_REV": pa.array(columns[5], pa.float64()),
+        "ROW_COUNT": pa.array(columns[6], pa.int64()),
+    })
+    return _finish(table, year, fingerprint)
+
+
+def build_from_snapshot(year, root=snapshot_store.SNAPSHOT_ROOT):
+    """Cube slice of one FY aggregated from the local Parquet snapshot."""
+    dataset = snapshot_store.open_dataset(f"{TABLE_PREFIX}{year}", root)
+    table = dataset.to_table(columns=[
+        "YYMM", "ZONE_FRM", "CMDT", "WR", "CHBL_WGHT", "TOT_FRT_INCL_GST", "TOT_GST",
+    ])
+    # Same value the DuckDB source's MAX(YYMM), COUNT(*) returns for the snapshot
+    fingerprint = query_cache.format_fingerprint(pc.max(table.column("YYMM")).as_py(), table.num_rows)
+    table = pa.table({
+        "YYMM": pc.cast(table.column("YYMM"), pa.string()),
+        "ZONE_FRM": pc.cast(table.column("ZONE_FRM"), pa.string()),
+        "CMDT": pc.utf8_trim_whitespace(pc.cast(table.column("CMDT"), pa.string())),
+        "WR": pc.cast(table.column("WR"), pa.float64()),
+        "CHBL_WGHT": pc.cast(table.column("CHBL_WGHT"), pa.float64()),
+        "ORIG_REV": pc.subtract(
+            pc.cast(table.column("TOT_FRT_INCL_GST"), pa.float64()),
+            pc.cast(table.column("TOT_GST"), pa.float64()),
+        ),
+        "ONE": pa.array(np.ones(table.num_rows, dtype=np.int64)),
+    })
+    grouped = table.group_by(["YYMM", "ZONE_FRM", "CMDT"], use_threads=True).aggregate([
+        ("WR", "sum", pc.ScalarAggregateOptions(min_count=1)),
+        ("CHBL_WGHT", "sum", pc.ScalarAggregateOptions(min_count=1)),
+        ("ORIG_REV", "sum", pc.ScalarAggregateOptions(min_count=1)),
+        ("ONE", "sum"),
+    ])
+    grouped = grouped.rename_columns([
+        {"WR_sum": "WR", "CHBL_WGHT_sum": "CHBL_WGHT", "ORIG_REV_sum": "ORIG_REV",
+         "ONE_sum": "ROW_COUNT"}.get(name, name)
+        for name in grouped.column_names
+    ])
+    return _finish(grouped, year, fingerprint)
+
+
+def write_cube(table, year, root=CUBE_DIR):
+    """Replace one FY file of the cube atomically."""
+    os.makedirs(root, exist_ok=True)
+    path = cube_path(year, root)
+    tmp = path + ".tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+    return table.num_rows
+
+
+def load_cube(years, root=CUBE_DIR):
+    """Cube rows for the given years as a DataFrame."""
+    tables = [pq.read_table(cube_path(y, root)) for y in years]
+    return pa.concat_tables(tables).to_pandas()
+
+
+# --- Answering page aggregates ---
+def _in_window(cube, bounds_by_year):
+    """Mask of cube rows inside each year's (first, last) YYMM window."""
+    lower = cube["FY"].map({y: int(b[0]) for y, b in bounds_by_year.items()})
+    upper = cube["FY"].map({y: int(b[1]) for y, b in bounds_by_year.items()})
+    return cube["MONTH_KEY"].between(lower, upper)
+
+
+def traffic_measures(cube, years):
+    """page1's raw measures per year over each whole table (as traffic_summary.measures_from_rows)."""
+    rows = cube[cube["FY"].isin(years)]
+    is_wr = rows["ZONE_FRM"] == "WR"
+    not_wr = rows["ZONE_FRM"].notna() & ~is_wr
+    measures = pd.DataFrame({
+        "LOADING_WR": rows["CHBL_WGHT"].where(is_wr),
+        "ORIG_REV_WR": rows["ORIG_REV"].where(is_wr),
+        "WR_OUTWARD": rows["WR"].where(is_wr),
+        "WR_INWARD": rows["WR"].where(not_wr),
+        "FY": rows["FY"],
+    }).groupby("FY").sum(min_count=1)
+    return measures.reindex(years).astype(float).fillna(0.0)
+
+
+def commodity_revenue(cube, years, month_num):
+    """page2's long frame (same columns as commodity_revenue.frame_from_rows)."""
+    rows = cube[cube["CMDT"].notna() & _in_window(cube, {y: fiscal.fy_bounds(y) for y in years})]
+    in_period = _in_window(rows, {y: fiscal.period_bounds(y, month_num) for y in years})
+    per_cmdt = pd.DataFrame({
+        "FY": rows["FY"],
+        "Commodity": rows["CMDT"],
+        "Period_Revenue": rows["WR"].where(in_period),
+        "Period_Rows": rows["ROW_COUNT"].where(in_period, 0),
+        "Full_Year_Revenue": rows["WR"],
+    }).groupby(["FY", "Commodity"], as_index=False).sum(min_count=1)
+    # A commodity with period rows but all-NULL WR still appears, as in SQL
+    has_period = per_cmdt["Period_Rows"] > 0
+    per_cmdt.loc[~has_period, "Period_Revenue"] = np.nan
+    per_cmdt = per_cmdt.drop(columns="Period_Rows")
+    per_cmdt["Is_Total"] = False
+
+    totals = rows.groupby("FY")["WR"].sum(min_count=1).rename("Full_Year_Revenue").reset_index()
+    totals["Commodity"] = None
+    totals["Period_Revenue"] = np.nan
+    totals["Is_Total"] = True
+    return pd.concat([per_cmdt, totals[per_cmdt.columns]], ignore_index=True)
+
+
+def commodity_monthly(cube, years):
+    """Projection input (same columns as commodity_revenue.monthly_frame_from_rows)."""
+    rows = cube[cube["CMDT"].notna() & _in_window(cube, {y: fiscal.fy_bounds(y) for y in years})]
+    return (
+        rows.groupby(["FY", "CMDT", "MONTH_KEY"], as_index=False)["WR"].sum(min_count=1)
+        .rename(columns={"CMDT": "Commodity", "MONTH_KEY": "YYMM", "WR": "Revenue"})
+    )
+
+
+def month_counts(cube, year):
+    """Row counts per calendar month key of one FY."""
+    rows = cube[cube["FY"] == year]
+    return rows.groupby("MONTH_KEY")["ROW_COUNT"].sum()
+
+
+def zone_counts(cube, year):
+    """Row counts per origin zone of one FY, largest first."""
+    rows = cube[cube["FY"] == year]
+    return rows.groupby("ZONE_FRM")["ROW_COUNT"].sum().sort_values(ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the monthly revenue cube")
+    parser.add_argument("--source", choices=["oracle", "snapshot"], default="oracle")
+    parser.add_argument("--years", nargs="+", required=True, help="FY codes, e.g. 25_26 24_25")
+    parser.add_argument("--snapshot-root", default=snapshot_store.SNAPSHOT_ROOT)
+    parser.add_argument("--cube-dir", default=CUBE_DIR)
+    args = parser.parse_args()
+
+    if args.source == "oracle":
+        import db
+        with db.connection() as conn:
+            for year in args.years:
+                rows = write_cube(build_from_oracle(conn, year, db.TARGET_SCHEMA), year, args.cube_dir)
+                print(f"{year}: {rows} cube rows")
+    else:
+        for year in args.years:
+            rows = write_cube(build_from_snapshot(year, args.snapshot_root), year, args.cube_dir)
+            print(f"{year}: {rows} cube rows")
+
+
+if __name__ == "__main__":
+    main()
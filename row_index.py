@@ -0,0 +1,82 @@
+"""Month x zone block index over a loaded FY table.
+
+The frame is sorted once, at load time, by fiscal month and then by zone, so
+every (month, zone) pair is one contiguous run of rows. The run boundaries
+are kept in df.attrs[ATTR]. A month range (wrapping past March or not) plus
+an optional zone then resolves to a handful of row slices, with no boolean
+scan over the table and no copy of the base frame.
+"""
+import numpy as np
+import pandas as pd
+
+ATTR = "month_zone_index"
+N_MONTHS = 12
+
+
+def build(df, month_column, zone_column):
+    """df sorted by (fiscal month, zone) with its block boundaries in attrs.
+
+    month_column must be the ordered April-March categorical from
+    fiscal.calendar(); rows without a month are expected to be dropped already.
+    """
+    month_codes = df[month_column].cat.codes.to_numpy().astype(np.int64)
+    if zone_column in df.columns:
+        zones = pd.Categorical(df[zone_column])
+        categories = list(zones.categories)
+        zone_codes = zones.codes.astype(np.int64)
+    else:
+        categories = []
+        zone_codes = np.full(len(df), -1, dtype=np.int64)
+    # One slot per zone plus a last slot for rows without a zone
+    slots = len(categories) + 1
+    zone_codes = np.where(zone_codes < 0, slots - 1, zone_codes)
+
+    keys = month_codes * slots + zone_codes
+    order = np.argsort(keys, kind="stable")
+    df = df.take(order)
+    df.index = pd.RangeIndex(len(df))
+    bounds = np.searchsorted(keys[order], np.arange(N_MONTHS * slots + 1))
+    df.attrs[ATTR] = {"zones": categories, "slots": slots, "bounds": bounds, "rows": len(df)}
+    return df
+
+
+def get(df):
+    """The block index of df, or None if it has none or it no longer matches the frame."""
+    index = df.attrs.get(ATTR)
+    if index is None or index["rows"] != len(df):
+        return None
+    return index
+
+
+def positions(index, months, zone=None):
+    """Row slices for fiscal month ordinals (0 = April) and an optional zone.
+
+    Returns a list of (start, stop) pairs in row order.
+    """
+    slots, bounds = index["slots"], index["bounds"]
+    if zone is None:
+        spans = [(bounds[m * slots], bounds[(m + 1) * slots]) for m in months]
+    else:
+        if zone not in index["zones"]:
+            return []
+        z = index["zones"].index(zone)
+        spans = [(bounds[m * slots + z], bounds[m * slots + z + 1]) for m in months]
+    # Merge adjacent runs so a plain month range stays a single slice
+    merged = []
+    for start, stop in spans:
+        if stop <= start:
+            continue
+        if merged and merged[-1][1] == start:
+            merged[-1] = (merged[-1][0], stop)
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def select(df, spans):
+    """Rows of df covered by the spans: a slice for one run, a take for several."""
+    if len(spans) == 1:
+        return df.iloc[spans[0][0]:spans[0][1]]
+    if not spans:
+        return df.iloc[0:0]
+    return df.take(np.concatenate([np.arange(start, stop) for start, stop in spans]))
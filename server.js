@@ -2,7 +2,10 @@ const express = require('express');
 const oracledb = require('oracledb');
 const cors = require('cors');
 require('dotenv').config();
-oracledb.initOracleClient({libDir: process.env.INSTANT_CLIENT});
+// Thin mode by default; the Instant Client is loaded only for ORACLE_DRIVER_MODE=thick
+if ((process.env.ORACLE_DRIVER_MODE || 'thin').toLowerCase() === 'thick') {
+  oracledb.initOracleClient({libDir: process.env.INSTANT_CLIENT});
+}
 const app = express();
 app.use(cors());
 app.use(express.json());
@@ -30,13 +33,17 @@ const yearLabels = {
   "17_18": "2017-18"
 };
 
-// SQL queries
-const queries = [
-  "SELECT SUM(CHBL_WGHT) AS SUM_DIFF FROM {schema}.{table} WHERE ZONE_FRM = 'WR'",
-  "SELECT SUM(TOT_FRT_INCL_GST - TOT_GST) AS SUM_DIFF FROM {schema}.{table} WHERE ZONE_FRM = 'WR'",
-  "SELECT SUM(WR) AS SUM_DIFF FROM {schema}.{table} WHERE ZONE_FRM = 'WR'",
-  "SELECT SUM(WR) AS SUM_DIFF FROM {schema}.{table} WHERE ZONE_FRM != 'WR'"
-];
+// All four measures per year from one scan (conditional aggregation),
+// with the years stacked by UNION ALL into a single statement
+const measureSql = `
+    SUM(CASE WHEN ZONE_FRM = 'WR' THEN CHBL_WGHT END) AS LOADING_WR,
+    SUM(CASE WHEN ZONE_FRM = 'WR' THEN TOT_FRT_INCL_GST - TOT_GST END) AS ORIG_REV_WR,
+    SUM(CASE WHEN ZONE_FRM = 'WR' THEN WR END) AS WR_OUTWARD,
+    SUM(CASE WHEN ZONE_FRM != 'WR' THEN WR END) AS WR_INWARD`;
+
+const summaryQuery = (tableYears) => tableYears
+  .map(year => `SELECT '${year}' AS FY,${measureSql}\n  FROM ${TARGET_SCHEMA}.carr_apmt_excl_adv_${year}`)
+  .join("\nUNION ALL\n");
 
 // Helper function to calculate percentage variance
 const calculatePctVar = (current, previous) => {
@@ -57,20 +64,18 @@ app.get('/api/traffic-data', async (req, res) => {
     const tableYears = years.slice(selectedIdx, selectedIdx + 5);
     
     const connection = await oracledb.getConnection(dbConfig);
+    const summary = await connection.execute(summaryQuery(tableYears));
+    await connection.close();
+
+    const measuresByYear = {};
+    for (const [fy, ...vals] of summary.rows) {
+      measuresByYear[fy] = vals.map(v => v || 0);
+    }
     
     const results = [];
     
     for (const year of tableYears) {
-      const table = `carr_apmt_excl_adv_${year}`;
-      const rowVals = [];
-      
-      for (const q of queries) {
-        const result = await connection.execute(
-          q.replace('{schema}', TARGET_SCHEMA).replace('{table}', table)
-        );
-        const val = result.rows[0][0] || 0;
-        rowVals.push(val);
-      }
+      const rowVals = measuresByYear[year] || [0, 0, 0, 0];
       
       // Calculate derived values
       const [row3, row4] = [rowVals[2], rowVals[3]];
@@ -105,8 +110,6 @@ app.get('/api/traffic-data', async (req, res) => {
       });
     }
     
-    await connection.close();
-    
     // Prepare summary data
     const summaryData = results.map(r => r.values);
     const summaryNames = [
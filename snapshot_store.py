@@ -0,0 +1,202 @@
+"""Partitioned Parquet snapshots of the FOISGOODS.carr_apmt_excl_adv_YY_YY tables.
+
+Layout (hive style, one directory per table):
+
+    snapshots/carr_apmt_excl_adv_24_25/FY=24_25/MONTH_KEY=202404/ZONE_FRM=WR/part-....parquet
+
+YYMM is parsed once at ingest into an int32 MONTH_KEY (e.g. 202404) and every
+file is written with Parquet min/max column statistics, so readers only open
+the partitions (and row groups) that match their month / zone filters. Rows
+whose YYMM doesn't parse are kept under MONTH_KEY=__HIVE_DEFAULT_PARTITION__
+(a null month key), so the snapshot stays a complete copy of the table.
+"""
+import glob
+import json
+import os
+import re
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# --- Constants ---
+SNAPSHOT_ROOT = os.environ.get("SNAPSHOT_ROOT", "snapshots")
+TABLE_PREFIX = "carr_apmt_excl_adv_"
+DATE_COLUMN = "YYMM"
+ZONE_COLUMN = "ZONE_FRM"
+MONTH_KEY_COLUMN = "MONTH_KEY"
+FY_COLUMN = "FY"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"   # directory value of a null partition key
+COLUMNS_KEY = b"snapshot.columns"   # file metadata: the source table's column order
+
+PARTITION_SCHEMA = pa.schema([
+    (FY_COLUMN, pa.string()),
+    (MONTH_KEY_COLUMN, pa.int32()),
+    (ZONE_COLUMN, pa.string()),
+])
+
+ROW_GROUP_SIZE = 128 * 1024
+
+
+def fy_code(table_name):
+    """Return the financial year code ('24_25') for a carr_apmt_excl_adv_YY_YY table."""
+    match = re.search(r"(\d{2}_\d{2})$", table_name)
+    if not match:
+        raise ValueError(f"Not a financial-year table: {table_name}")
+    return match.group(1)
+
+
+def table_dir(table_name, root=SNAPSHOT_ROOT):
+    """Directory holding the snapshot of one table."""
+    return os.path.join(root, table_name.lower())
+
+
+def snapshot_exists(table_name, root=SNAPSHOT_ROOT):
+    """True when a snapshot has been written for the table."""
+    path = table_dir(table_name, root)
+    return os.path.isdir(path) and any(os.scandir(path))
+
+
+def parse_month_key(yymm):
+    """Vectorised YYMM -> int32 month key (YYYYMM); unparseable values become null."""
+    arr = pa.array(yymm) if not isinstance(yymm, (pa.Array, pa.ChunkedArray)) else yymm
+    if not pa.types.is_string(arr.type) and not pa.types.is_large_string(arr.type):
+        arr = pc.cast(arr, pa.string())
+    digits = pc.utf8_slice_codeunits(pc.utf8_trim_whitespace(arr), 0, 6)
+    valid = pc.match_substring_regex(digits, r"^\d{6}$")
+    keys = pc.if_else(valid, digits, pa.scalar(None, pa.string()))
+    return pc.cast(keys, pa.int32())
+
+
+def to_arrow(df, table_name, schema=None):
+    """Convert a fetched frame/batch to Arrow and add the FY and MONTH_KEY partition columns."""
+    if isinstance(df, pd.DataFrame):
+        table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    else:
+        table = df
+    # ZONE_FRM moves into the path, so the files record where it sat in the source
+    metadata = dict(table.schema.metadata or {})
+    metadata[COLUMNS_KEY] = json.dumps(table.column_names).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+    month_key = parse_month_key(table.column(DATE_COLUMN))
+    fy = pa.array([fy_code(table_name)] * table.num_rows, pa.string())
+    # Rows whose YYMM can't be parsed keep a null MONTH_KEY (the null partition);
+    # month-range filters skip them, full reads and counts still see them
+    return table.append_column(FY_COLUMN, fy).append_column(MONTH_KEY_COLUMN, month_key)
+
+
+def write_snapshot(table_name, data, root=SNAPSHOT_ROOT, schema=None, replace_months=None):
+    """Write a frame (or iterable of frames / Arrow tables) into the table's partitions.
+
+    replace_months: month keys whose existing partitions are deleted first
+    (used by incremental pulls); None appends alongside what is there.
+    Returns the number of rows written.
+    """
+    path = table_dir(table_name, root)
+    if replace_months:
+        delete_months(table_name, replace_months, root)
+
+    if isinstance(data, (pd.DataFrame, pa.Table)):
+        data = [data]
+
+    rows = 0
+    for chunk in data:
+        table = to_arrow(chunk, table_name, schema)
+        if table.num_rows == 0:
+            continue
+        ds.write_dataset(
+            table,
+            path,
+            format="parquet",
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(
+                compression="zstd", write_statistics=True
+            ),
+            max_rows_per_group=ROW_GROUP_SIZE,
+        )
+        rows += table.num_rows
+    return rows
+
+
+def delete_months(table_name, month_keys, root=SNAPSHOT_ROOT):
+    """Remove the partitions of the given month keys (None: the null partition) from a table snapshot."""
+    fy_dir = os.path.join(table_dir(table_name, root), f"{FY_COLUMN}={fy_code(table_name)}")
+    for key in month_keys:
+        value = NULL_PARTITION if key is None else int(key)
+        month_dir = os.path.join(fy_dir, f"{MONTH_KEY_COLUMN}={value}")
+        if os.path.isdir(month_dir):
+            shutil.rmtree(month_dir)
+
+
+def source_columns(table_name, root=SNAPSHOT_ROOT):
+    """Column names of the source table in their original order, or None for older snapshots."""
+    for path in glob.iglob(os.path.join(table_dir(table_name, root), "**", "*.parquet"), recursive=True):
+        columns = (pq.read_schema(path).metadata or {}).get(COLUMNS_KEY)
+        return json.loads(columns) if columns else None
+    return None
+
+
+def drop_snapshot(table_name, root=SNAPSHOT_ROOT):
+    """Remove a whole table snapshot (before a full re-pull)."""
+    path = table_dir(table_name, root)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+
+
+def open_dataset(table_name, root=SNAPSHOT_ROOT):
+    """Open a table snapshot as a pyarrow dataset with typed partition columns."""
+    return ds.dataset(
+        table_dir(table_name, root),
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+    )
+
+
+def build_filter(start_key=None, end_key=None, zones=None):
+    """Dataset filter on MONTH_KEY range (inclusive) and ZONE_FRM values."""
+    expr = None
+    if start_key is not None:
+        expr = ds.field(MONTH_KEY_COLUMN) >= int(start_key)
+    if end_key is not None:
+        cond = ds.field(MONTH_KEY_COLUMN) <= int(end_key)
+        expr = cond if expr is None else expr & cond
+    if zones:
+        cond = ds.field(ZONE_COLUMN).isin(list(zones))
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def read_snapshot(table_name, columns=None, start_key=None, end_key=None, zones=None,
+                  root=SNAPSHOT_ROOT):
+    """Read only the partitions matching the month range / zones as a DataFrame."""
+    dataset = open_dataset(table_name, root)
+    table = dataset.to_table(columns=columns, filter=build_filter(start_key, end_key, zones))
+    return table.to_pandas()
+
+
+def file_statistics(table_name, column=DATE_COLUMN, root=SNAPSHOT_ROOT):
+    """Per-file row counts and min/max of a column, read from Parquet footers only."""
+    records = []
+    for fragment in open_dataset(table_name, root).get_fragments():
+        meta = pq.ParquetFile(fragment.path).metadata
+        idx = meta.schema.to_arrow_schema().get_field_index(column)
+        mins, maxs = [], []
+        if idx >= 0:
+            for i in range(meta.num_row_groups):
+                stats = meta.row_group(i).column(idx).statistics
+                if stats is not None and stats.has_min_max:
+                    mins.append(stats.min)
+                    maxs.append(stats.max)
+        records.append({
+            "path": fragment.path,
+            "rows": meta.num_rows,
+            "min": min(mins) if mins else None,
+            "max": max(maxs) if maxs else None,
+        })
+    return pd.DataFrame(records)
@@ -0,0 +1,227 @@
+"""Synthetic carr_apmt_excl_adv_YY_YY tables for testing and benchmarks.
+
+Generates FOIS-like rows (YYMM, ZONE_FRM / ZONE_TO, CMDT, stations, wagons,
+CHBL_WGHT, TOT_FRT_INCL_GST, TOT_GST and the WR apportioned share) with
+seasonal months and Zipf-skewed zones and commodities, chunk by chunk so any
+row count fits in memory. Tables are loaded into a local DuckDB or SQLite
+file, or into the Parquet snapshot store, as stand-ins for the production
+database.
+
+    python synthetic_fois.py --target duckdb --path fois.duckdb --rows 1000000 --years 24_25 23_24
+"""
+import argparse
+import sqlite3
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import fiscal
+import snapshot_store
+
+TABLE_PREFIX = "carr_apmt_excl_adv_"
+SCHEMA = "FOISGOODS"
+CHUNK_ROWS = 1_000_000
+TARGETS = ("duckdb", "sqlite", "snapshot")
+
+# WR first: the tables are WR's apportioned share, so WR dominates originating traffic
+ZONES = ["WR", "CR", "NR", "SR", "ER", "SCR", "SER", "SECR", "ECR", "ECOR",
+         "NCR", "NER", "NFR", "NWR", "SWR", "WCR", "KR"]
+# (code, rate per tonne-km in rupees)
+COMMODITIES = [
+    ("COAL", 1.45), ("IORE", 1.60), ("CEMT", 1.35), ("FG", 1.20), ("FERT", 1.05),
+    ("POL", 1.70), ("CONT", 1.25), ("STEL", 1.55), ("PIGI", 1.50), ("OTHR", 1.30),
+    ("SALT", 0.95), ("SUGR", 1.15), ("LIME", 1.10), ("AUTO", 1.40), ("CLNK", 1.30),
+]
+CMDT_WIDTH = 6           # CHAR column: codes come back blank-padded, as in FOIS
+N_STATIONS = 400
+GST_RATE = 0.05
+# Relative traffic per fiscal month (April ... March), with the usual March peak
+MONTH_WEIGHTS = [0.078, 0.080, 0.076, 0.072, 0.070, 0.074, 0.080, 0.083, 0.087, 0.090, 0.092, 0.118]
+
+ARROW_SCHEMA = pa.schema([
+    ("YYMM", pa.string()),
+    ("ZONE_FRM", pa.string()),
+    ("ZONE_TO", pa.string()),
+    ("CMDT", pa.string()),
+    ("STTN_FROM", pa.string()),
+    ("STTN_TO", pa.string()),
+    ("WGON_CNT", pa.int32()),
+    ("CHBL_WGHT", pa.float64()),
+    ("TOT_FRT_INCL_GST", pa.float64()),
+    ("TOT_GST", pa.float64()),
+    ("WR", pa.float64()),
+])
+
+SQLITE_TYPES = {pa.string(): "TEXT", pa.int32(): "INTEGER", pa.float64(): "REAL"}
+
+
+def table_name(year):
+    return f"{TABLE_PREFIX}{year}"
+
+
+def zipf_weights(n, skew):
+    """Normalised 1 / rank**skew weights (skew 0 = uniform)."""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return weights / weights.sum()
+
+
+def _codes(rng, values, weights, n):
+    """String column drawn from values with the given weights, built as dictionary codes."""
+    indices = rng.choice(len(values), size=n, p=weights).astype(np.int32)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(values)).cast(pa.string())
+
+
+def _with_nulls(rng, array, rate):
+    if rate <= 0:
+        return array
+    mask = pa.array(rng.random(len(array)) < rate)
+    return pc.if_else(mask, pa.scalar(None, array.type), array)
+
+
+def generate_chunk(year, n, rng, zone_skew=1.1, cmdt_skew=1.0, null_rate=0.001):
+    """One Arrow table of n synthetic rows for a fiscal year."""
+    months = [fiscal.month_yymm(year, fiscal.MONTHS[name]) for name in fiscal.MONTH_NAMES]
+    month_weights = np.array(MONTH_WEIGHTS) / sum(MONTH_WEIGHTS)
+    zone_weights = zipf_weights(len(ZONES), zone_skew)
+    cmdt_weights = zipf_weights(len(COMMODITIES), cmdt_skew)
+    stations = [f"S{i:03d}" for i in range(N_STATIONS)]
+
+    cmdt_idx = rng.choice(len(COMMODITIES), size=n, p=cmdt_weights)
+    rates = np.array([rate for _, rate in COMMODITIES])[cmdt_idx]
+    cmdt = pa.array([code.ljust(CMDT_WIDTH) for code, _ in COMMODITIES])
+    zone_frm_idx = rng.choice(len(ZONES), size=n, p=zone_weights)
+    zone_to_idx = rng.choice(len(ZONES), size=n, p=zone_weights)
+
+    wagons = rng.integers(1, 59, size=n).astype(np.int32)
+    weight = np.round(wagons * rng.normal(61.0, 4.0, size=n).clip(20, 70), 2)
+    distance = rng.lognormal(np.log(550), 0.6, size=n).clip(20, 3500)
+    freight = np.round(weight * distance * rates, 2)
+    gst = np.round(freight * GST_RATE, 2)
+
+    # WR's apportioned share: most of the freight when WR originates or terminates the
+    # traffic, a smaller carried-route share otherwise
+    from_wr = zone_frm_idx == 0
+    to_wr = zone_to_idx == 0
+    share = np.where(from_wr, rng.uniform(0.35, 1.0, n),
+                     np.where(to_wr, rng.uniform(0.2, 0.6, n), rng.uniform(0.0, 0.3, n)))
+    wr = np.round(freight * share, 2)
+
+    return pa.table({
+        "YYMM": _codes(rng, months, month_weights, n),
+        "ZONE_FRM": _with_nulls(rng, pa.DictionaryArray.from_arrays(
+            zone_frm_idx.astype(np.int32), pa.array(ZONES)).cast(pa.string()), null_rate),
+        "ZONE_TO": pa.DictionaryArray.from_arrays(
+            zone_to_idx.astype(np.int32), pa.array(ZONES)).cast(pa.string()),
+        "CMDT": _with_nulls(rng, pa.DictionaryArray.from_arrays(
+            cmdt_idx.astype(np.int32), cmdt).cast(pa.string()), null_rate),
+        "STTN_FROM": _codes(rng, stations, zipf_weights(N_STATIONS, 0.8), n),
+        "STTN_TO": _codes(rng, stations, zipf_weights(N_STATIONS, 0.8), n),
+        "WGON_CNT": pa.array(wagons),
+        "CHBL_WGHT": pa.array(weight),
+        "TOT_FRT_INCL_GST": pa.array(freight + gst),
+        "TOT_GST": pa.array(gst),
+        "WR": pa.array(wr),
+    }, schema=ARROW_SCHEMA)
+
+
+def generate(year, rows, seed=0, chunk_rows=CHUNK_ROWS, **skew):
+    """Yield Arrow chunks adding up to `rows` rows for one fiscal year (deterministic per seed)."""
+    year_seed = fiscal.fy_start_year(year)
+    for i, start in enumerate(range(0, rows, chunk_rows)):
+        rng = np.random.default_rng([seed, year_seed, i])
+        yield generate_chunk(year, min(chunk_rows, rows - start), rng, **skew)
+
+
+# --- Loading ---
+def load_duckdb(path, year, chunks, schema=SCHEMA):
+    """Create (or replace) the year's table in a DuckDB file."""
+    import duckdb
+    conn = duckdb.connect(path)
+    try:
+        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        target = f"{schema}.{table_name(year)}"
+        conn.execute(f"DROP TABLE IF EXISTS {target}")
+        rows = 0
+        for chunk in chunks:
+            conn.register("chunk", chunk)
+            if rows == 0:
+                conn.execute(f"CREATE TABLE {target} AS SELECT * FROM chunk")
+            else:
+                conn.execute(f"INSERT INTO {target} SELECT * FROM chunk")
+            conn.unregister("chunk")
+            rows += chunk.num_rows
+    finally:
+        conn.close()
+    return rows
+
+
+def load_sqlite(path, year, chunks):
+    """Create (or replace) the year's table in a SQLite file (no schema prefix)."""
+    conn = sqlite3.connect(path)
+    try:
+        target = table_name(year)
+        columns = ", ".join(f"{f.name} {SQLITE_TYPES[f.type]}" for f in ARROW_SCHEMA)
+        conn.execute(f"DROP TABLE IF EXISTS {target}")
+        conn.execute(f"CREATE TABLE {target} ({columns})")
+        placeholders = ", ".join("?" for _ in ARROW_SCHEMA)
+        rows = 0
+        for chunk in chunks:
+            conn.executemany(
+                f"INSERT INTO {target} VALUES ({placeholders})",
+                zip(*[column.to_pylist() for column in chunk.columns]),
+            )
+            rows += chunk.num_rows
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def load_snapshot(root, year, chunks):
+    """Replace the year's table in the Parquet snapshot store."""
+    snapshot_store.drop_snapshot(table_name(year), root)
+    return snapshot_store.write_snapshot(table_name(year), chunks, root=root)
+
+
+def build(target, path, years, rows, seed=0, **skew):
+    """Generate and load `rows` rows per year; returns {year: rows}."""
+    if target not in TARGETS:
+        raise ValueError(f"Unknown target: {target}")
+    loaded = {}
+    for year in years:
+        chunks = generate(year, rows, seed, **skew)
+        if target == "duckdb":
+            loaded[year] = load_duckdb(path, year, chunks)
+        elif target == "sqlite":
+            loaded[year] = load_sqlite(path, year, chunks)
+        else:
+            loaded[year] = load_snapshot(path, year, chunks)
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic carr_apmt_excl_adv tables")
+    parser.add_argument("--target", choices=TARGETS, default="duckdb")
+    parser.add_argument("--path", help="Database file, or snapshot root for --target snapshot")
+    parser.add_argument("--years", nargs="+", default=fiscal.year_codes()[:5], help="FY codes, e.g. 24_25")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows per year")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--zone-skew", type=float, default=1.1, help="Zipf exponent for zones")
+    parser.add_argument("--cmdt-skew", type=float, default=1.0, help="Zipf exponent for commodities")
+    parser.add_argument("--null-rate", type=float, default=0.001, help="Share of NULL CMDT / ZONE_FRM")
+    args = parser.parse_args()
+
+    path = args.path or {"duckdb": "fois.duckdb", "sqlite": "fois.sqlite",
+                         "snapshot": snapshot_store.SNAPSHOT_ROOT}[args.target]
+    start = time.perf_counter()
+    loaded = build(args.target, path, args.years, args.rows, args.seed,
+                   zone_skew=args.zone_skew, cmdt_skew=args.cmdt_skew, null_rate=args.null_rate)
+    for year, rows in loaded.items():
+        print(f"{table_name(year)}: {rows:,} rows")
+    print(f"Loaded into {path} ({args.target}) in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
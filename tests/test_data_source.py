@@ -0,0 +1,23 @@
+"""DuckDB snapshot views return the source table's columns in their original order."""
+import pandas as pd
+
+import data_source
+import snapshot_store
+
+TABLE = "carr_apmt_excl_adv_24_25"
+
+
+def test_view_keeps_source_column_order(tmp_path):
+    frame = pd.DataFrame({
+        "YYMM": ["202404", "202405", None],
+        "ZONE_FRM": ["WR", "CR", "NR"],
+        "CMDT": ["COAL", "IORE", "CEMT"],
+        "WR": [1.0, 2.0, 3.0],
+    })
+    snapshot_store.write_snapshot(TABLE, frame, root=str(tmp_path))
+    assert snapshot_store.source_columns(TABLE, str(tmp_path)) == list(frame.columns)
+
+    source = data_source.DuckDBSource(root=str(tmp_path))
+    result = source.fetch_frame(f"SELECT * FROM {source.schema}.{TABLE}")
+    assert list(result.columns) == list(frame.columns)
+    assert len(result) == len(frame)
@@ -0,0 +1,44 @@
+"""Artifact cache pruning around a freshly finished export."""
+import os
+
+import pandas as pd
+import pytest
+
+import export_jobs
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(export_jobs, "ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(export_jobs, "_jobs", {})
+    return tmp_path
+
+
+def frame(rows):
+    return pd.DataFrame({"YYMM": ["202404"] * rows, "ZONE_FRM": ["CR"] * rows, "WR": range(rows)})
+
+
+def run(filters, rows):
+    job = export_jobs.submit("fp", "carr_apmt_excl_adv_24_25", filters, "csv.gz", lambda: frame(rows))
+    return export_jobs.wait(job, timeout=30)
+
+
+def test_fresh_artifact_survives_pruning(cache, monkeypatch):
+    old = run(("April",), 20000)
+    assert old.status == export_jobs.DONE and os.path.exists(old.path)
+    os.utime(old.path, (0, 0))
+
+    # Room for one artifact only: the older one goes, the new one is kept
+    monkeypatch.setattr(export_jobs, "MAX_ARTIFACT_BYTES", os.path.getsize(old.path) * 3 // 2)
+    new = run(("May",), 20000)
+    assert new.status == export_jobs.DONE and os.path.exists(new.path)
+    assert not os.path.exists(old.path)
+    assert not os.path.exists(export_jobs.rows_path(old.key))
+
+
+def test_artifact_over_the_cap_fails(cache, monkeypatch):
+    monkeypatch.setattr(export_jobs, "MAX_ARTIFACT_BYTES", 16)
+    job = run(("April",), 1000)
+    assert job.status == export_jobs.FAILED
+    assert "EXPORT_CACHE_MAX_MB" in job.error
+    assert os.listdir(cache) == []
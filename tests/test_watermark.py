@@ -0,0 +1,78 @@
+"""Incremental pulls against a DuckDB stand-in for the Oracle table.
+
+ORA_HASH and ALL_TAB_COLUMNS only exist in Oracle, so the two Oracle-side
+steps (fetch_fingerprints, stream_table) are replaced by DuckDB equivalents
+that run the SQL incremental_pull builds.
+"""
+import duckdb
+import pytest
+
+import data_source
+import snapshot_store
+import watermark
+
+SCHEMA = "FOISGOODS"
+TABLE = "carr_apmt_excl_adv_24_25"
+
+
+@pytest.fixture
+def source(monkeypatch):
+    conn = duckdb.connect()
+    conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    conn.execute(f"CREATE TABLE {SCHEMA}.{TABLE} (YYMM VARCHAR, ZONE_FRM VARCHAR, WR DOUBLE)")
+
+    def fetch_fingerprints(connection, schema, table):
+        rows = connection.execute(
+            f"SELECT YYMM, COUNT(*), SUM(hash(ZONE_FRM, WR)) FROM {schema}.{table} GROUP BY YYMM"
+        ).fetchall()
+        return {
+            watermark.NULL_MONTH if yymm is None else str(yymm): {"rows": int(n), "checksum": str(checksum)}
+            for yymm, n, checksum in rows
+        }
+
+    def stream_table(connection, schema, table, output_format, snapshot_root, query, binds):
+        frame = connection.execute(data_source.duckdb_sql(query), binds).df()
+        return {"rows": snapshot_store.write_snapshot(table, frame, root=snapshot_root)}
+
+    monkeypatch.setattr(watermark, "fetch_fingerprints", fetch_fingerprints)
+    monkeypatch.setattr(watermark.extract, "stream_table", stream_table)
+    yield conn
+    conn.close()
+
+
+def insert(conn, rows):
+    conn.executemany(f"INSERT INTO {SCHEMA}.{TABLE} VALUES (?, ?, ?)", rows)
+
+
+def snapshot_counts(root):
+    frame = snapshot_store.read_snapshot(TABLE, root=str(root))
+    return frame["YYMM"].isna().sum(), len(frame)
+
+
+def test_null_yymm_rows_follow_the_source(source, tmp_path):
+    insert(source, [("202404", "WR", 1.0), ("202405", "CR", 2.0), (None, "WR", 3.0), (None, "NR", 4.0)])
+    first = watermark.incremental_pull(source, SCHEMA, TABLE, root=str(tmp_path))
+    assert watermark.NULL_MONTH in first["changed"]
+    assert snapshot_counts(tmp_path) == (2, 4)
+    assert watermark.load_watermark(TABLE, str(tmp_path))["max_yymm"] == "202405"
+
+    # One more NULL-YYMM row: only the NULL group is re-pulled
+    insert(source, [(None, "CR", 5.0)])
+    second = watermark.incremental_pull(source, SCHEMA, TABLE, root=str(tmp_path))
+    assert second["changed"] == [watermark.NULL_MONTH]
+    assert second["rows"] == 3
+    assert snapshot_counts(tmp_path) == (3, 5)
+
+    # NULL-YYMM rows gone from the source: the null partition is emptied
+    source.execute(f"DELETE FROM {SCHEMA}.{TABLE} WHERE YYMM IS NULL")
+    third = watermark.incremental_pull(source, SCHEMA, TABLE, root=str(tmp_path))
+    assert third["removed"] == [watermark.NULL_MONTH]
+    assert snapshot_counts(tmp_path) == (0, 2)
+
+
+def test_month_query_selects_null_group():
+    assert watermark.month_query(SCHEMA, TABLE, watermark.NULL_MONTH) == (
+        f"SELECT * FROM {SCHEMA}.{TABLE} WHERE YYMM IS NULL", {}
+    )
+    sql, binds = watermark.month_query(SCHEMA, TABLE, "202404")
+    assert sql.endswith("WHERE YYMM = :yymm") and binds == {"yymm": "202404"}
@@ -0,0 +1,77 @@
+"""Goods traffic summary (page1): all four measures of a year in one scan.
+
+Each year's table is scanned once with conditional aggregation (four sums
+instead of four queries). page1 runs year_query() for each year concurrently
+on separate pooled sessions (see db.run_concurrent), so latency is that of
+the slowest year. The derived rows (3 + 4 and the ratios) are computed
+column-wise in pandas.
+"""
+import numpy as np
+import pandas as pd
+
+TABLE_PREFIX = "carr_apmt_excl_adv_"
+
+# Raw measures in page1's row order (rows 1-4)
+MEASURES = ["LOADING_WR", "ORIG_REV_WR", "WR_OUTWARD", "WR_INWARD"]
+
+MEASURE_SQL = """
+        SUM(CASE WHEN ZONE_FRM = 'WR' THEN CHBL_WGHT END) AS LOADING_WR,
+        SUM(CASE WHEN ZONE_FRM = 'WR' THEN TOT_FRT_INCL_GST - TOT_GST END) AS ORIG_REV_WR,
+        SUM(CASE WHEN ZONE_FRM = 'WR' THEN WR END) AS WR_OUTWARD,
+        SUM(CASE WHEN ZONE_FRM != 'WR' THEN WR END) AS WR_INWARD"""
+
+ROW_NAMES = [
+    "SUM(CHBL_WGHT) (WR)", "SUM(TOT_FRT_INCL_GST - TOT_GST) (WR)",
+    "SUM(WR) (WR)", "SUM(WR) (not WR)", "row 3 + row 4",
+    "row 5 / row 2 (%)", "row 3 / row 2 (%)", "row 3 / row 5 (%)", "row 4 / row 5 (%)"
+]
+
+
+def year_query(year, schema):
+    """(FY, LOADING_WR, ORIG_REV_WR, WR_OUTWARD, WR_INWARD) of one year's whole table.
+
+    Returns (sql, binds) like the other per-year builders; there are no binds.
+    """
+    sql = f"SELECT '{year}' AS FY,{MEASURE_SQL}\n    FROM {schema}.{TABLE_PREFIX}{year}"
+    return sql, {}
+
+
+def measures_from_rows(rows, years):
+    """Frame of raw measures from year_query() rows, indexed by year code in the order given."""
+    measures = pd.DataFrame(rows, columns=["FY"] + MEASURES).set_index("FY")
+    return measures.reindex(years).astype(float).fillna(0.0)
+
+
+def _ratio(num, den):
+    """num / den as a percentage, NaN where the denominator is zero."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den != 0, num / den * 100, np.nan).round(2)
+
+
+def derive_rows(measures):
+    """page1's nine rows (values in crore, ratios in %) as a years x rows frame."""
+    loading = measures["LOADING_WR"].to_numpy()
+    orig = measures["ORIG_REV_WR"].to_numpy()
+    outward = measures["WR_OUTWARD"].to_numpy()
+    inward = measures["WR_INWARD"].to_numpy()
+    total = outward + inward
+
+    values = np.column_stack([loading, orig, outward, inward, total]) / 1e7
+    ratios = np.column_stack([
+        _ratio(total, orig),
+        _ratio(outward, orig),
+        _ratio(outward, total),
+        _ratio(inward, total),
+    ])
+    return pd.DataFrame(np.hstack([values, ratios]), columns=ROW_NAMES, index=measures.index)
+
+
+def pct_var(frame):
+    """% change of the first year column over the second, per row (NaN if no base)."""
+    if frame.shape[1] < 2:
+        return pd.Series(np.nan, index=frame.index)
+    curr = frame.iloc[:, 0].to_numpy(dtype=float)
+    prev = frame.iloc[:, 1].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.where(prev != 0, (curr - prev) / prev * 100, np.nan)
+    return pd.Series(change.round(2), index=frame.index)
@@ -0,0 +1,146 @@
+"""Per-table watermarks for incremental (delta) pulls by YYMM.
+
+The watermark of a table is its max YYMM plus, for every month, a row count
+and a checksum computed inside Oracle. A run re-fingerprints the source with
+one grouped scan (no rows leave the database), then re-pulls only the months
+that are new or whose fingerprint changed and replaces their partitions in
+the snapshot. Rows with a NULL YYMM are fingerprinted as one more "month"
+(NULL_MONTH) and land in the snapshot's null month partition, like
+parallel_extract's yymm_null shard.
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+import extract
+import snapshot_store
+
+WATERMARK_FILE = "_watermark.json"  # '_' prefix keeps it out of the Parquet dataset
+NULL_MONTH = "__null__"             # watermark key of the rows whose YYMM is NULL
+
+# Column types ORA_HASH can't take
+UNHASHABLE_TYPES = ("BLOB", "CLOB", "NCLOB", "LONG", "LONG RAW", "BFILE")
+
+
+def watermark_path(table_name, root=snapshot_store.SNAPSHOT_ROOT):
+    """Location of a table's watermark file."""
+    return os.path.join(snapshot_store.table_dir(table_name, root), WATERMARK_FILE)
+
+
+def load_watermark(table_name, root=snapshot_store.SNAPSHOT_ROOT):
+    """Stored watermark, or None if the table has never been pulled incrementally."""
+    path = watermark_path(table_name, root)
+    if not os.path.exists(path) or not snapshot_store.snapshot_exists(table_name, root):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermark(table_name, months, root=snapshot_store.SNAPSHOT_ROOT):
+    """Write the watermark atomically next to the snapshot."""
+    path = watermark_path(table_name, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    watermark = {
+        "table": table_name,
+        "max_yymm": max((m for m in months if m != NULL_MONTH), default=None),
+        "months": months,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(watermark, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+    return watermark
+
+
+def fingerprint_query(schema, table, column_details):
+    """Per-month row count and checksum over every column, computed server-side."""
+    hashes = [
+        f"NVL(ORA_HASH({col[0]}, 4294967295, {i}), 0)"
+        for i, col in enumerate(column_details)
+        if col[1] not in UNHASHABLE_TYPES
+    ]
+    return f"""
+        SELECT YYMM, COUNT(*) AS ROW_COUNT, SUM({' + '.join(hashes)}) AS CHECKSUM
+        FROM {schema}.{table}
+        GROUP BY YYMM
+    """
+
+
+def fetch_fingerprints(connection, schema, table):
+    """{yymm: {"rows": n, "checksum": "..."}} for the source table."""
+    cursor = connection.cursor()
+    try:
+        details = extract.fetch_column_details(cursor, schema, table)
+        cursor.execute(fingerprint_query(schema, table, details))
+        return {
+            NULL_MONTH if yymm is None else str(yymm): {"rows": int(count), "checksum": str(checksum)}
+            for yymm, count, checksum in cursor.fetchall()
+        }
+    finally:
+        cursor.close()
+
+
+def month_key(yymm):
+    """Snapshot month key for a raw YYMM value, or None if it doesn't parse (or is NULL_MONTH)."""
+    if yymm == NULL_MONTH:
+        return None
+    digits = str(yymm).strip()[:6]
+    return int(digits) if len(digits) == 6 and digits.isdigit() else None
+
+
+def diff_months(source, stored):
+    """Months to (re)pull and months that disappeared from the source."""
+    stored = stored or {}
+    changed = sorted(m for m, fp in source.items() if stored.get(m) != fp)
+    removed = sorted(m for m in stored if m not in source)
+    return changed, removed
+
+
+def month_query(schema, table, yymm):
+    """(sql, binds) selecting one watermark month; NULL_MONTH selects the NULL-YYMM rows."""
+    if yymm == NULL_MONTH:
+        return f"SELECT * FROM {schema}.{table} WHERE YYMM IS NULL", {}
+    # One SQL text for every month so the cursor is shared and YYMM stays index-friendly
+    return f"SELECT * FROM {schema}.{table} WHERE YYMM = :yymm", {"yymm": yymm}
+
+
+def incremental_pull(connection, schema, table, root=snapshot_store.SNAPSHOT_ROOT):
+    """Bring the table's snapshot up to date by re-pulling only new or changed months."""
+    start = time.perf_counter()
+    source = fetch_fingerprints(connection, schema, table)
+    watermark = load_watermark(table, root)
+    if watermark is None:
+        # No usable snapshot: start clean so stale files can't mix with the new pull
+        snapshot_store.drop_snapshot(table, root)
+    stored = watermark["months"] if watermark else {}
+    changed, removed = diff_months(source, stored)
+    if any(month_key(m) is None for m in changed + removed):
+        # NULL and unparseable YYMMs share the null partition, so it is re-pulled as a whole
+        changed = sorted(set(changed) | {m for m in source if month_key(m) is None})
+
+    stale_keys = {month_key(m) for m in changed + removed}
+    snapshot_store.delete_months(table, stale_keys, root)
+    # Forget the stale months first, so a failed run re-pulls them next time
+    stale = set(changed) | set(removed)
+    save_watermark(table, {m: fp for m, fp in stored.items() if m not in stale}, root)
+
+    rows = 0
+    for yymm in changed:
+        query, binds = month_query(schema, table, yymm)
+        stats = extract.stream_table(
+            connection, schema, table, "snapshot", snapshot_root=root, query=query, binds=binds,
+        )
+        rows += stats["rows"]
+
+    save_watermark(table, source, root)
+    seconds = time.perf_counter() - start
+    return {
+        "changed": changed,
+        "removed": removed,
+        "unchanged": len(source) - len(changed),
+        "rows": rows,
+        "seconds": seconds,
+        "peak_rss_mb": extract.peak_rss_mb(),
+    }